@@ -0,0 +1,153 @@
+import hashlib
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+
+from app.api.schemas import ChatResponse, HoroscopeRequest, chat_reply
+from app.core.analytics import analytics_sink
+from app.core.auth import path_user
+from app.core.astro import PLANETS, ZODIAC_NAMES
+from app.core.astro_engine import EngineOverloaded
+from app.core.chart_cache import birth_data, get_planets
+from app.core.clients import get_openai
+from app.core.codec import FastJSONResponse
+from app.core.generation import generation
+from app.core.geo import place_index
+from app.core.http_cache import REVALIDATE, etag_for, not_modified
+from app.core.llm import generate_natal_analysis, stream_natal_analysis
+from app.core.metrics import cache_hit
+from app.core.ratelimit import admitted
+from app.core.sse import sse_reply, sse_stream
+from app.core.user_cache import get_user, save_generation, birth_unchanged
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.get("/api/search_place")
+async def search_place(q: str, limit: int = 7):
+    # Автодополнение места рождения из офлайн-индекса
+    places = place_index.search(q, limit=min(limit, 20))
+    return {"places": [
+        {"name": p.name, "country": p.country, "lat": p.lat, "lon": p.lon, "tz": p.tz}
+        for p in places
+    ]}
+
+
+def astro_overloaded() -> HTTPException:
+    # Сбрасываем нагрузку: клиент повторит запрос чуть позже
+    return HTTPException(status_code=503, detail="Звезды перегружены, попробуйте позже",
+                         headers={"Retry-After": "2"})
+
+
+@router.get("/api/get_natal_chart/{user_id}")
+async def get_natal_chart(raw_req: Request, user_id: int = Depends(path_user)):
+    user = await get_user(user_id)
+
+    if not user or not user.birth_date:
+        return {"error": "Нет данных рождения"}
+
+    analytics_sink.track(user.id, "api_get_natal_chart")
+
+    # Карта - функция только данных рождения: правки имени или темы ее не сбрасывают
+    etag = etag_for("chart", *birth_data(user))
+    headers = {"ETag": etag, "Cache-Control": REVALIDATE}
+    if not_modified(raw_req, etag):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        # Карта берется из общего кэша, расчет только при промахе
+        planets = await get_planets(user)
+
+        planets_data = []
+        for (_, name, icon), planet in zip(PLANETS, planets):
+            sign_ru = ZODIAC_NAMES.get(planet["sign"], planet["sign"])
+            planets_data.append({
+                "name": name, "icon": icon, "sign": sign_ru,
+                "deg": f"{int(planet['lon'] % 30)}°"
+            })
+
+        return FastJSONResponse({"status": "ok", "planets": planets_data}, headers=headers)
+    except EngineOverloaded:
+        raise astro_overloaded()
+    except Exception as e:
+        logger.error(f"Astro calc error: {e}")
+        return {"error": "Ошибка расчета орбит"}
+
+
+@router.post("/api/analyze_natal_chart", response_model=ChatResponse)
+async def analyze_natal_chart(request: HoroscopeRequest = Depends(admitted(HoroscopeRequest))):
+    user = await get_user(request.user_id)
+
+    if not user or not user.birth_date:
+        return chat_reply("Сначала заполните дату рождения в настройках.")
+
+    analytics_sink.track(user.id, "api_analyze_natal_chart")
+    cache_hit("user.natal_analysis", bool(user.natal_analysis))
+    if user.natal_analysis:
+        return chat_reply(user.natal_analysis)
+
+    try:
+        planets = await get_planets(user)
+        # Для промпта достаточно личных планет: Солнце, Луна, Меркурий, Венера, Марс
+        chart_summary = ", ".join(f"{p['id']} in {p['sign']}" for p in planets[:5])
+    except EngineOverloaded:
+        raise astro_overloaded()
+    except Exception as e:
+        logger.error(f"Error calculating: {e}")
+        return chat_reply("Звезды сейчас не видны.")
+
+    try:
+        # Ключ по хэшу карты: после смены даты рождения будет новая генерация
+        gen_key = (user.id, "natal", hashlib.sha1(chart_summary.encode()).hexdigest())
+        analysis_text = await generation.run(
+            gen_key, lambda: generate_natal_analysis(get_openai(), chart_summary)
+        )
+
+        # Если профиль успели поменять, трактовка уже про другую карту - не пишем
+        await save_generation(user.id, *birth_unchanged(user), natal_analysis=analysis_text)
+
+        return chat_reply(analysis_text)
+    except Exception as e:
+        logger.error(f"OpenAI error: {e}")
+        return chat_reply("Оракул сейчас отдыхает.")
+
+
+@router.post("/api/analyze_natal_chart/stream")
+async def analyze_natal_chart_stream(request: HoroscopeRequest = Depends(admitted(HoroscopeRequest))):
+    # Тот же разбор, но токены уходят клиенту по мере генерации (SSE)
+    # Поток может идти секундами - сессию из Depends не берем вообще
+    user = await get_user(request.user_id)
+
+    if not user or not user.birth_date:
+        return sse_reply("Сначала заполните дату рождения в настройках.")
+
+    analytics_sink.track(user.id, "api_analyze_natal_chart_stream")
+
+    cache_hit("user.natal_analysis", bool(user.natal_analysis))
+    if user.natal_analysis:
+        return sse_reply(user.natal_analysis)
+
+    try:
+        planets = await get_planets(user)
+        chart_summary = ", ".join(f"{p['id']} in {p['sign']}" for p in planets[:5])
+    except EngineOverloaded:
+        raise astro_overloaded()
+    except Exception as e:
+        logger.error(f"Error calculating: {e}")
+        return sse_reply("Звезды сейчас не видны.")
+
+    gen_key = (user.id, "natal", hashlib.sha1(chart_summary.encode()).hexdigest())
+
+    # Двойной тап: второй запрос ждет текст уже идущей генерации, а не платит за свою
+    ready = await generation.wait(gen_key)
+    if ready:
+        return sse_reply(ready)
+
+    async def save(text: str):
+        await save_generation(user.id, *birth_unchanged(user), natal_analysis=text)
+
+    return sse_stream(
+        stream_natal_analysis(get_openai(), chart_summary), save, fallback="Оракул сейчас отдыхает.",
+        result=generation.claim(gen_key),
+    )
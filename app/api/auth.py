@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends
+
+from app.api.schemas import AuthRequest, AuthResponse
+from app.core.auth import sessions, verify_init_data
+from app.core.codec import FastJSONResponse, json_body
+from app.core.config import settings
+
+router = APIRouter()
+
+
+@router.post("/api/auth", response_model=AuthResponse)
+async def auth(request: AuthRequest = Depends(json_body(AuthRequest))):
+    # initData проверяется здесь один раз за запуск мини-аппа, дальше - токен сессии
+    user_id = verify_init_data(request.init_data)
+    return FastJSONResponse(AuthResponse(
+        token=sessions.issue(user_id), user_id=user_id, expires_in=settings.SESSION_TTL
+    ))
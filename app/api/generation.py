@@ -0,0 +1,126 @@
+import logging
+from datetime import date
+
+from fastapi import APIRouter, Depends
+from sqlalchemy import or_
+
+from app.api.schemas import ChatResponse, AffirmationRequest, HoroscopeRequest, chat_reply
+from app.core.analytics import analytics_sink
+from app.core.clients import get_openai
+from app.core.generation import generation
+from app.core.llm import AFFIRMATION_PROMPT, advice_prompt, generate_daily_advice, generate_affirmation
+from app.core.llm_guard import LLMUnavailable
+from app.core.metrics import cache_hit
+from app.core.prompt_cache import prompt_cache
+from app.core.ratelimit import admitted
+from app.core.transits import sky_context
+from app.core.user_cache import get_user, save_generation
+from app.models import UserGeneration
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+# --- СОВЕТ ДНЯ ---
+@router.post("/api/daily_advice", response_model=ChatResponse)
+async def daily_advice(request: HoroscopeRequest = Depends(admitted(HoroscopeRequest))):
+    today = date.today()
+    gen_key = (request.user_id, "daily_advice", today)
+
+    # Совет на сегодня уже в памяти - даже в БД не ходим
+    cached = generation.get(gen_key)
+    if cached:
+        return chat_reply(cached)
+
+    user = await get_user(request.user_id)
+
+    if user:
+        analytics_sink.track(user.id, "api_daily_advice")
+
+    advice_ready = bool(user and user.daily_advice and user.last_advice_date == today)
+    cache_hit("user.daily_advice", advice_ready)
+    if advice_ready:
+        generation.remember(gen_key, user.daily_advice)
+        return chat_reply(user.daily_advice)
+
+    try:
+        async def advise() -> str:
+            # Транзиты считаются внутри генерации: параллельные запросы ждут один расчет
+            sky = await sky_context(user)
+            # Тот же промпт сегодня уже был у кого-то еще - берем один из его вариантов
+            return await prompt_cache.run(
+                "advice", advice_prompt(request.message, sky),
+                lambda: generate_daily_advice(get_openai(), request.message, sky), day=today
+            )
+
+        advice_text = await generation.run(gen_key, advise)
+
+        if user:
+            # Не затираем совет, который успела записать ночная предгенерация
+            await save_generation(
+                user.id, or_(UserGeneration.last_advice_date.is_(None), UserGeneration.last_advice_date != today),
+                daily_advice=advice_text, last_advice_date=today
+            )
+
+        return chat_reply(advice_text)
+
+    except LLMUnavailable:
+        # OpenAI тормозит или breaker открыт: лучше вчерашний совет, чем ошибка
+        if user and user.daily_advice:
+            return chat_reply(user.daily_advice)
+        return chat_reply("Звезды сегодня молчаливы... (Попробуйте позже)")
+    except Exception as e:
+        logger.error(f"OpenAI error: {e}")
+        return chat_reply("Энергетический сбой. Повторите запрос.")
+
+
+# --- АФФИРМАЦИЯ ---
+@router.post("/api/get_affirmation", response_model=ChatResponse)
+async def get_affirmation(request: AffirmationRequest = Depends(admitted(AffirmationRequest, anonymous=True))):
+    # user_id нужен, чтобы сохранить в базу; без него просто генерируем
+    user_id = request.user_id
+
+    # Пытаемся достать юзера для сохранения
+    user = None
+    today = date.today()
+    gen_key = (user_id, "affirmation", today)
+    if user_id:
+        cached = generation.get(gen_key)
+        if cached:
+            return chat_reply(cached)
+
+        user = await get_user(user_id)
+        if user:
+            analytics_sink.track(user.id, "api_get_affirmation")
+        # Если уже есть аффирмация на сегодня - возвращаем её (экономим GPT)
+        affirmation_ready = bool(user and user.daily_affirmation and user.last_affirmation_date == today)
+        cache_hit("user.daily_affirmation", affirmation_ready)
+        if affirmation_ready:
+            generation.remember(gen_key, user.daily_affirmation)
+            return chat_reply(user.daily_affirmation)
+
+    try:
+        if user:
+            affirmation_text = await generation.run(gen_key, lambda: generate_affirmation(get_openai()))
+        else:
+            # Без профиля (нет или чужой user_id) сохранять некуда - общий пул вариантов
+            # на день вместо новой генерации на каждый запрос
+            affirmation_text = await prompt_cache.run(
+                "affirmation", AFFIRMATION_PROMPT, lambda: generate_affirmation(get_openai()), day=today
+            )
+
+        # Сохраняем в БД
+        if user:
+            await save_generation(
+                user.id, or_(UserGeneration.last_affirmation_date.is_(None), UserGeneration.last_affirmation_date != today),
+                daily_affirmation=affirmation_text, last_affirmation_date=today
+            )
+
+        return chat_reply(affirmation_text)
+    except LLMUnavailable:
+        if user and user.daily_affirmation:
+            return chat_reply(user.daily_affirmation)
+        return chat_reply("Вселенная любит тебя. (Ошибка связи)")
+    except Exception as e:
+        logger.error(f"Affirmation error: {e}")
+        return chat_reply("Вселенная любит тебя. (Ошибка связи)")
@@ -0,0 +1,94 @@
+import logging
+
+from fastapi import APIRouter, Depends
+
+from app.api.schemas import ChatResponse, HoroscopeRequest, chat_reply
+from app.core.analytics import analytics_sink
+from app.core.clients import get_openai
+from app.core.generation import generation
+from app.core.llm import stream_numerology, numerology_prefix
+from app.core.llm_guard import LLMUnavailable
+from app.core.metrics import cache_hit
+from app.core.numerology import calculate_life_path_number, numerology_store
+from app.core.ratelimit import admitted
+from app.core.sse import sse_reply, sse_stream
+from app.core.user_cache import get_user, save_generation
+from app.models import User
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.post("/api/get_numerology", response_model=ChatResponse)
+async def get_numerology(request: HoroscopeRequest = Depends(admitted(HoroscopeRequest))):
+    user = await get_user(request.user_id)
+
+    if not user or not user.birth_date:
+        return chat_reply("Сначала укажите дату рождения.")
+
+    analytics_sink.track(user.id, "api_get_numerology")
+
+    cache_hit("user.numerology_analysis", bool(user.numerology_analysis))
+    if user.numerology_analysis:
+        return chat_reply(user.numerology_analysis)
+
+    life_path_number = calculate_life_path_number(user.birth_date)
+
+    try:
+        # Трактовка общая для всех с тем же числом пути
+        full_reply = await numerology_store.get(get_openai(), life_path_number)
+
+        await save_generation(user.id, User.birth_date == user.birth_date, numerology_analysis=full_reply)
+
+        return chat_reply(full_reply)
+    except LLMUnavailable:
+        return chat_reply("Числа сейчас молчат. Попробуйте позже.")
+    except Exception as e:
+        return chat_reply(f"Ошибка нумерологии: {e}")
+
+
+@router.post("/api/get_numerology/stream")
+async def get_numerology_stream(request: HoroscopeRequest = Depends(admitted(HoroscopeRequest))):
+    user = await get_user(request.user_id)
+
+    if not user or not user.birth_date:
+        return sse_reply("Сначала укажите дату рождения.")
+
+    analytics_sink.track(user.id, "api_get_numerology_stream")
+
+    cache_hit("user.numerology_analysis", bool(user.numerology_analysis))
+    if user.numerology_analysis:
+        return sse_reply(user.numerology_analysis)
+
+    life_path_number = calculate_life_path_number(user.birth_date)
+
+    async def save(text: str):
+        await save_generation(user.id, User.birth_date == user.birth_date, numerology_analysis=text)
+
+    try:
+        # Если в общем пуле уже есть вариант - стримить нечего
+        ready = await numerology_store.peek(get_openai(), life_path_number)
+    except Exception as e:
+        logger.error(f"Numerology store error: {e}")
+        ready = None
+
+    if ready:
+        await save(ready)
+        return sse_reply(ready)
+
+    # Пул пуст, а стрим для этого пользователя уже идет (двойной тап) - ждем его текст
+    gen_key = (user.id, "numerology", life_path_number)
+    ready = await generation.wait(gen_key)
+    if ready:
+        return sse_reply(ready)
+
+    async def save_and_share(text: str):
+        await save(text)
+        # В общий пул попадает, только пока он не полон (как и в нестриминговом пути)
+        await numerology_store.add(life_path_number, text)
+
+    return sse_stream(
+        stream_numerology(get_openai(), life_path_number), save_and_share,
+        fallback="Ошибка нумерологии. Попробуйте позже.", prefix=numerology_prefix(life_path_number),
+        result=generation.claim(gen_key),
+    )
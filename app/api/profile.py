@@ -0,0 +1,117 @@
+from datetime import date, time
+
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import case, update, or_
+
+from app.api.schemas import ProfileResponse, ProfileUpdate
+from app.core.analytics import analytics_sink
+from app.core.auth import authorized, path_user
+from app.core.codec import FastJSONResponse
+from app.core.database import get_db, dialect_insert
+from app.core.geo import place_index
+from app.core.http_cache import REVALIDATE, NO_STORE, etag_for, not_modified
+from app.core.metrics import span
+from app.core.user_cache import get_user, invalidate_user
+from app.models import User, UserGeneration
+
+router = APIRouter()
+
+
+@router.get("/api/get_profile/{user_id}", response_model=ProfileResponse)
+async def get_profile(raw_req: Request, user_id: int = Depends(path_user)):
+    user = await get_user(user_id)
+
+    today = date.today()
+
+    if not user:
+        return FastJSONResponse(headers={"Cache-Control": NO_STORE}, content=ProfileResponse(
+            user_id=user_id, full_name="Гость", birth_date=None,
+            birth_time=None, birth_place=None, theme="default",
+            natal_analysis=None, numerology_analysis=None,
+            daily_advice=None, daily_affirmation=None
+        ))
+
+    analytics_sink.track(user.id, "api_get_profile")
+
+    # Ответ зависит только от строки пользователя и даты (совет/аффирмация на сегодня)
+    etag = etag_for(user.id, user.version, today)
+    headers = {"ETag": etag, "Cache-Control": REVALIDATE}
+    if not_modified(raw_req, etag):
+        return Response(status_code=304, headers=headers)
+
+    # Проверяем дату кэша
+    advice = user.daily_advice if user.last_advice_date == today else None
+    affirmation = user.daily_affirmation if user.last_affirmation_date == today else None
+
+    return FastJSONResponse(headers=headers, content=ProfileResponse(
+        user_id=user.id,
+        full_name=user.full_name,
+        birth_date=user.birth_date.isoformat() if user.birth_date else None,
+        birth_time=user.birth_time.strftime("%H:%M") if user.birth_time else None,
+        birth_place=user.birth_place,
+        theme=user.theme,
+        natal_analysis=user.natal_analysis,
+        numerology_analysis=user.numerology_analysis,
+        daily_advice=advice,
+        daily_affirmation=affirmation
+    ))
+
+
+@router.post("/api/update_profile")
+async def update_profile(request: ProfileUpdate = Depends(authorized(ProfileUpdate)),
+                         db: AsyncSession = Depends(get_db)):
+    # Частичное обновление: пишем только пришедшие поля, без чтения строки
+    values = {}
+    if request.full_name: values["full_name"] = request.full_name
+    if request.theme: values["theme"] = request.theme
+
+    if request.birth_place:
+        values["birth_place"] = request.birth_place
+        # Резолвим место один раз здесь, а не при каждом расчете карты
+        place = place_index.resolve(request.birth_place)
+        values["birth_lat"], values["birth_lon"], values["birth_tz"] = (
+            (place.lat, place.lon, place.tz) if place else (None, None, None)
+        )
+
+    if request.birth_date:
+        try:
+            values["birth_date"] = date.fromisoformat(request.birth_date)
+        except ValueError:
+            pass
+
+    if request.birth_time:
+        try:
+            values["birth_time"] = time.fromisoformat(request.birth_time)
+        except ValueError:
+            pass
+
+    with span("db"):
+        # Тексты, посчитанные по старым данным рождения, сбрасываем до записи профиля:
+        # сравнение идет с тем, что лежит в БД, а не с возможно устаревшим кэшем
+        date_changed = [getattr(User, f).is_distinct_from(values[f])
+                        for f in ("birth_date", "birth_time") if f in values]
+        place_changed = [User.birth_place.is_distinct_from(values["birth_place"])] if "birth_place" in values else []
+        if date_changed or place_changed:
+            # Другое место - другая карта, но нумерология зависит только от даты и времени
+            numerology = (case((or_(*date_changed), None), else_=UserGeneration.numerology_analysis)
+                          if date_changed else UserGeneration.numerology_analysis)
+            await db.execute(
+                update(UserGeneration)
+                .where(UserGeneration.user_id == request.user_id, User.id == UserGeneration.user_id,
+                       or_(*date_changed, *place_changed))
+                .values(natal_analysis=None, numerology_analysis=numerology)
+            )
+
+        # Один upsert вместо select + add: два первых сохранения подряд не упадут на дубликате id
+        await db.execute(
+            dialect_insert(User)
+            .values(id=request.user_id, **values)
+            .on_conflict_do_update(index_elements=[User.id], set_={**values, "version": User.version + 1})
+        )
+
+    with span("commit"):
+        await db.commit()
+    await invalidate_user(request.user_id)
+    analytics_sink.track(request.user_id, "api_update_profile")
+    return {"status": "success"}
@@ -0,0 +1,61 @@
+from pydantic import BaseModel
+
+from app.core.codec import FastJSONResponse
+
+
+# --- DTO ---
+# user_id в телах запросов подставляет сессия (app.core.auth.authorized), клиент его
+# не присылает. Поле остается для локальной разработки с AUTH_REQUIRED=False
+class ChatRequest(BaseModel):
+    user_id: int | None = None
+    message: str
+
+
+class ChatResponse(BaseModel):
+    reply: str
+
+
+class AffirmationRequest(BaseModel):
+    user_id: int | None = None
+
+
+class HoroscopeRequest(BaseModel):
+    user_id: int | None = None
+    message: str
+
+
+class AuthRequest(BaseModel):
+    init_data: str
+
+
+class AuthResponse(BaseModel):
+    token: str
+    user_id: int
+    expires_in: int
+
+
+class ProfileResponse(BaseModel):
+    user_id: int
+    full_name: str | None
+    birth_date: str | None
+    birth_time: str | None
+    birth_place: str | None
+    theme: str | None
+    natal_analysis: str | None
+    numerology_analysis: str | None
+    daily_advice: str | None
+    daily_affirmation: str | None
+
+
+class ProfileUpdate(BaseModel):
+    user_id: int | None = None
+    full_name: str | None = None
+    birth_date: str | None = None
+    birth_time: str | None = None
+    birth_place: str | None = None
+    theme: str | None = None
+
+
+def chat_reply(text: str) -> FastJSONResponse:
+    # Модель собираем без повторной валидации, сериализатор у нее готовый
+    return FastJSONResponse(ChatResponse.model_construct(reply=text))
@@ -0,0 +1,41 @@
+import asyncio
+import logging
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+
+logger = logging.getLogger(__name__)
+
+
+class UpdateRunner:
+    """
+    Обработка апдейтов из вебхука в фоне: роут сразу отвечает Telegram 200,
+    а хендлеры крутятся в задачах с ограниченной параллельностью.
+    """
+
+    def __init__(self, dp: Dispatcher, max_concurrency: int, max_pending: int):
+        self.dp = dp
+        self.max_pending = max_pending
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def overloaded(self) -> bool:
+        return len(self._tasks) >= self.max_pending
+
+    def submit(self, bot: Bot, update: Update) -> None:
+        task = asyncio.create_task(self._process(bot, update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _process(self, bot: Bot, update: Update) -> None:
+        async with self._semaphore:
+            try:
+                await self.dp.feed_update(bot, update)
+            except Exception:
+                logger.exception(f"Update {update.update_id} failed")
+
+    async def drain(self) -> None:
+        # При остановке даем дообработать уже принятые апдейты
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,154 @@
+import json
+import asyncio
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.models import AnalyticsEvent
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class AnalyticsSink:
+    """
+    Неблокирующая запись analytics_events.
+    track() кладет событие в очередь в памяти, фоновая задача пишет их
+    многострочными INSERT пачками по размеру или по таймеру.
+    Если БД недоступна - пачка уходит в локальный файл и дозаписывается при следующем старте.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, max_queue: int, spill_path: str):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_path = Path(spill_path)
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: asyncio.Task | None = None
+
+    def track(self, user_id: int, event_type: str, details: str | None = None) -> None:
+        event = {"user_id": user_id, "event_type": event_type, "details": details,
+                 "created_at": datetime.now()}
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Аналитика не должна тормозить запросы - при переполнении теряем событие
+            logger.warning(f"Analytics queue is full, event dropped: {event_type}")
+
+    async def start(self) -> None:
+        await self._replay_spill()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        # Дожидаемся, пока фоновая задача допишет все, что лежит в очереди
+        if self._task is None:
+            return
+        if not self._task.done():
+            # Упавшая задача метку уже не заберет - put на полной очереди повис бы навсегда
+            await self._queue.put(_STOP)
+        try:
+            await self._task
+        except Exception as e:
+            logger.error(f"Analytics writer had failed: {e!r}")
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            stopping = False
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+            if stopping:
+                return
+
+    async def _flush(self, batch: list[dict]) -> None:
+        try:
+            try:
+                async with async_session_factory() as db:
+                    await db.execute(insert(AnalyticsEvent).values(batch))
+                    await db.commit()
+            except IntegrityError:
+                # Обычно событие на несуществующего юзера: одна такая строка не должна
+                # стоить всей пачки - пишем по одной и отбрасываем только плохие
+                await self._insert_rows(batch)
+        except Exception as e:
+            logger.error(f"Analytics flush failed, spilling {len(batch)} events: {e}")
+            try:
+                await asyncio.to_thread(self._spill, batch)
+            except OSError as e:
+                # Диск полон или нет прав: теряем пачку, но не фоновую задачу - иначе
+                # очередь перестала бы разбираться до рестарта
+                logger.error(f"Analytics spill failed, {len(batch)} events lost: {e}")
+
+    async def _insert_rows(self, batch: list[dict]) -> None:
+        rejected = 0
+        async with async_session_factory() as db:
+            for event in batch:
+                try:
+                    async with db.begin_nested():  # SAVEPOINT: ошибка откатывает только эту строку
+                        await db.execute(insert(AnalyticsEvent).values(event))
+                except IntegrityError as e:
+                    rejected += 1
+                    logger.error(f"Analytics event rejected ({event['event_type']}, user {event['user_id']}): {e.orig}")
+            await db.commit()
+        logger.warning(f"Analytics batch written row by row: {len(batch) - rejected} saved, {rejected} rejected")
+
+    def _spill(self, batch: list[dict]) -> None:
+        with self.spill_path.open("a", encoding="utf-8") as f:
+            for event in batch:
+                f.write(json.dumps({**event, "created_at": event["created_at"].isoformat()},
+                                   ensure_ascii=False) + "\n")
+
+    async def _replay_spill(self) -> None:
+        # Переименовываем, чтобы новые сбросы во время дозаписи шли в свежий файл.
+        # Имя с pid, а rename атомарен: из воркеров, стартующих разом, файл забирает
+        # ровно один, остальные получают FileNotFoundError и ничего не дозаписывают
+        replay_path = self.spill_path.with_suffix(f".{os.getpid()}.replay")
+        try:
+            self.spill_path.replace(replay_path)
+        except FileNotFoundError:
+            return
+
+        events = []
+        for line in replay_path.read_text(encoding="utf-8").splitlines():
+            if line.strip():
+                event = json.loads(line)
+                event["created_at"] = datetime.fromisoformat(event["created_at"])
+                events.append(event)
+
+        logger.info(f"Replaying {len(events)} spilled analytics events")
+        for i in range(0, len(events), self.batch_size):
+            await self._flush(events[i:i + self.batch_size])
+        replay_path.unlink()
+
+
+analytics_sink = AnalyticsSink(
+    batch_size=settings.ANALYTICS_BATCH_SIZE,
+    flush_interval=settings.ANALYTICS_FLUSH_INTERVAL,
+    max_queue=settings.ANALYTICS_QUEUE_SIZE,
+    spill_path=settings.ANALYTICS_SPILL_PATH,
+)
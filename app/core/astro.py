@@ -0,0 +1,33 @@
+# Планеты, которые мы считаем и храним в кэше карт. Идентификаторы - как
+# flatlib.const (SUN = "Sun" и т.д.): сам flatlib со swisseph импортируется
+# только в compute_planets, то есть в процессах astro_engine, а не в API
+PLANETS = [
+    ("Sun", "Солнце", "☀️"), ("Moon", "Луна", "🌙"),
+    ("Mercury", "Меркурий", "☿️"), ("Venus", "Венера", "♀️"),
+    ("Mars", "Марс", "♂️"), ("Jupiter", "Юпитер", "♃"),
+    ("Saturn", "Сатурн", "♄"),
+]
+
+ZODIAC_NAMES = {
+    "Aries": "Овен", "Taurus": "Телец", "Gemini": "Близнецы",
+    "Cancer": "Рак", "Leo": "Лев", "Virgo": "Дева",
+    "Libra": "Весы", "Scorpio": "Скорпион", "Sagittarius": "Стрелец",
+    "Capricorn": "Козерог", "Aquarius": "Водолей", "Pisces": "Рыбы"
+}
+
+
+def compute_planets(b_date: str, b_time: str, lat: float, lon: float, utcoffset: str = "+00:00") -> list[dict]:
+    """Тяжелый расчет карты через flatlib. Возвращает только то, что нужно эндпоинтам."""
+    from flatlib.datetime import Datetime as FlatlibDatetime
+    from flatlib.geopos import GeoPos
+    from flatlib.chart import Chart
+
+    date_obj = FlatlibDatetime(b_date, b_time, utcoffset)
+    pos = GeoPos(lat, lon)
+    chart = Chart(date_obj, pos)
+
+    planets = []
+    for obj_code, _, _ in PLANETS:
+        planet = chart.get(obj_code)
+        planets.append({"id": obj_code, "sign": planet.sign, "lon": planet.lon})
+    return planets
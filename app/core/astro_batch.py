@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+from flatlib import const
+from flatlib.ephem import swe
+
+from app.core.astro import PLANETS
+
+# Пакетный расчет карт: много (дата, время, широта, долгота) за один вызов.
+# Сам swisseph считает по одной точке, но вся обвязка flatlib (объекты Chart,
+# углы, аспекты) пропускается, а знаки/градусы/дома считаются векторно в NumPy.
+
+OBJECTS = [obj for obj, _, _ in PLANETS]
+SIGNS = np.array(const.LIST_SIGNS)
+
+J2000 = np.datetime64("2000-01-01T12:00", "m")
+J2000_JD = 2451545.0
+MINUTES_PER_DAY = 1440.0
+
+
+@dataclass
+class BatchCharts:
+    """Результат пакетного расчета. Все массивы имеют форму (карты, планеты)."""
+    longitudes: np.ndarray  # float64, эклиптическая долгота 0..360
+    sign_index: np.ndarray  # int8, 0 = Овен
+    degrees: np.ndarray     # float64, градус внутри знака 0..30
+    houses: np.ndarray      # int8, 1..12
+
+    @property
+    def signs(self) -> np.ndarray:
+        return SIGNS[self.sign_index]
+
+    def __len__(self) -> int:
+        return self.longitudes.shape[0]
+
+    def planets(self, i: int) -> list[dict]:
+        """Карта i в формате compute_planets (для кэша карт и эндпоинтов)."""
+        return [
+            {"id": obj, "sign": str(SIGNS[self.sign_index[i, j]]), "lon": float(self.longitudes[i, j])}
+            for j, obj in enumerate(OBJECTS)
+        ]
+
+
+def parse_offsets(offsets: Iterable[str]) -> np.ndarray:
+    """'+03:00' -> 180 (минут)."""
+    minutes = []
+    for offset in offsets:
+        sign = -1 if offset.startswith("-") else 1
+        hours, mins = offset.lstrip("+-").split(":")
+        minutes.append(sign * (int(hours) * 60 + int(mins)))
+    return np.array(minutes, dtype="timedelta64[m]")
+
+
+def julian_days(dates: Iterable[str], times: Iterable[str], offsets: Iterable[str]) -> np.ndarray:
+    """Юлианские дни (UT) сразу для всех карт. Даты в формате flatlib: 'YYYY/MM/DD', 'HH:MM'."""
+    local = np.array(
+        [f"{d.replace('/', '-')}T{t}" for d, t in zip(dates, times)], dtype="datetime64[m]"
+    )
+    utc = local - parse_offsets(offsets)
+    return J2000_JD + (utc - J2000).astype(np.float64) / MINUTES_PER_DAY
+
+
+def compute_batch(jds: np.ndarray, lats: np.ndarray, lons: np.ndarray,
+                  hsys: str = const.HOUSES_DEFAULT) -> BatchCharts:
+    n = len(jds)
+    longitudes = np.empty((n, len(OBJECTS)), dtype=np.float64)
+    cusps = np.empty((n, 12), dtype=np.float64)
+
+    # Единственная часть с циклом - вызовы C-библиотеки
+    for i in range(n):
+        jd = float(jds[i])
+        for j, obj in enumerate(OBJECTS):
+            longitudes[i, j] = swe.sweObjectLon(obj, jd)
+        cusps[i] = swe.sweHousesLon(jd, float(lats[i]), float(lons[i]), hsys)[0][:12]
+
+    # Дом = куспид, от которого планета ушла на наименьший угол
+    offsets = (longitudes[:, :, None] - cusps[:, None, :]) % 360.0
+    houses = (offsets.argmin(axis=2) + 1).astype(np.int8)
+
+    return BatchCharts(
+        longitudes=longitudes,
+        sign_index=(longitudes // 30).astype(np.int8) % 12,
+        degrees=longitudes % 30,
+        houses=houses,
+    )
+
+
+def compute_charts(rows: Iterable[tuple[str, str, str, float, float]]) -> BatchCharts:
+    """Строки в формате chart_cache.birth_data: (дата, время, смещение UTC, широта, долгота)."""
+    rows = list(rows)
+    if not rows:
+        empty = np.empty((0, len(OBJECTS)))
+        return BatchCharts(empty, empty.astype(np.int8), empty, empty.astype(np.int8))
+
+    dates, times, offsets, lats, lons = zip(*rows)
+    jds = julian_days(dates, times, offsets)
+    return compute_batch(jds, np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64))
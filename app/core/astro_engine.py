@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+from app.core.config import settings
+from app.core.metrics import spans
+
+logger = logging.getLogger(__name__)
+
+
+def _warmup() -> None:
+    # Импорт flatlib/swisseph в воркере заранее, а не на первом запросе
+    import flatlib.chart  # noqa: F401
+
+
+def _timed(fn: Callable[..., Any], *args: Any) -> tuple[float, Any]:
+    # Время самого расчета в воркере; остальное - ожидание в очереди и пересылка
+    started = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - started, result
+
+
+class EngineOverloaded(Exception):
+    """Очередь расчетов заполнена, запрос нужно отклонить (503)."""
+
+
+class EngineTimeout(EngineOverloaded):
+    """Расчет не уложился в дедлайн: для клиента это та же перегрузка (503)."""
+
+
+class AstroEngine:
+    """
+    Пул процессов для CPU-тяжелых расчетов flatlib/swisseph.
+    Расчеты не делят GIL с event loop uvicorn и не занимают общий thread executor.
+    """
+
+    def __init__(self, workers: int, queue_size: int, timeout: float):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._pool: ProcessPoolExecutor | None = None
+        self._in_flight = 0
+
+    def start(self) -> None:
+        if self._pool is None:
+            # spawn: не форкаем процесс с живым event loop и потоками
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            for _ in range(self.workers):
+                self._pool.submit(_warmup)
+            logger.info(f"🪐 Astro engine started ({self.workers} workers)")
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def submit(self, fn: Callable[..., Any], *args: Any, timeout: float | None = None) -> Any:
+        # Ограниченная очередь: все сверх workers + queue_size сразу отклоняем
+        if self._in_flight >= self.workers + self.queue_size:
+            raise EngineOverloaded()
+
+        self.start()
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            job = self._pool.submit(_timed, fn, *args)
+            # Слот освобождается, когда расчет действительно закончился в пуле, а не когда
+            # вызывающий перестал ждать: иначе брошенные по таймауту расчеты копились бы
+            # сверх workers + queue_size
+            self._in_flight += 1
+            job.add_done_callback(lambda _: self._release(loop))
+            # shield: таймаут или отмена запроса не снимают уже запущенный расчет
+            run_time, result = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job)), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Astro job exceeded {timeout or self.timeout}s, {self._in_flight} in flight")
+            raise EngineTimeout()
+        except BrokenProcessPool:
+            # Воркер упал (OOM/segfault в swisseph) - пересоздаем пул для следующих запросов
+            logger.error("Astro engine pool is broken, restarting")
+            self.shutdown()
+            raise
+        spans.observe(run_time, span="chart_run")
+        spans.observe(time.perf_counter() - started - run_time, span="chart_wait")
+        return result
+
+    def _release(self, loop: asyncio.AbstractEventLoop) -> None:
+        # Колбэк future пула вызывается из его служебного потока - счетчик меняем в event loop
+        try:
+            loop.call_soon_threadsafe(self._decrement)
+        except RuntimeError:
+            pass  # Loop уже закрыт (остановка процесса)
+
+    def _decrement(self) -> None:
+        self._in_flight -= 1
+
+
+astro_engine = AstroEngine(
+    workers=settings.ASTRO_WORKERS,
+    queue_size=settings.ASTRO_QUEUE_SIZE,
+    timeout=settings.ASTRO_TIMEOUT,
+)
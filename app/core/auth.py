@@ -0,0 +1,144 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import Awaitable, Callable, TypeVar
+from urllib.parse import parse_qsl
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel
+
+from app.core.cache import TTLCache
+from app.core.codec import json_body
+from app.core.config import settings
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def same_digest(received: str, expected: str) -> bool:
+    # compare_digest на str с не-ASCII падает TypeError (вышел бы 500), поэтому сравниваем байты
+    return hmac.compare_digest(received.encode(), expected.encode())
+
+
+def unauthorized(detail: str = "Сессия истекла, перезапустите приложение") -> HTTPException:
+    return HTTPException(status_code=401, detail=detail)
+
+
+# --- INITDATA ---
+def _init_data_key() -> bytes:
+    # Ключ проверки initData по документации Telegram: HMAC-SHA256("WebAppData", токен бота)
+    return hmac.new(b"WebAppData", settings.BOT_TOKEN.get_secret_value().encode(), hashlib.sha256).digest()
+
+
+def verify_init_data(init_data: str) -> int:
+    """Проверяет подпись initData мини-аппа и возвращает id пользователя Telegram."""
+    fields = dict(parse_qsl(init_data, keep_blank_values=True))
+    received = fields.pop("hash", "")
+    data_check_string = "\n".join(f"{k}={v}" for k, v in sorted(fields.items()))
+    expected = hmac.new(_init_data_key(), data_check_string.encode(), hashlib.sha256).hexdigest()
+    if not received or not same_digest(received, expected):
+        raise unauthorized("Неверная подпись initData")
+
+    try:
+        auth_date = int(fields["auth_date"])
+        user_id = int(json.loads(fields["user"])["id"])
+    except (KeyError, ValueError, TypeError):
+        raise unauthorized("В initData нет пользователя")
+    if time.time() - auth_date > settings.INIT_DATA_MAX_AGE:
+        raise unauthorized("initData устарел, перезапустите приложение")
+    return user_id
+
+
+# --- СЕССИИ ---
+class SessionStore:
+    """
+    Токен сессии: "<user_id>.<истекает>.<подпись>". Подписывается ключом из токена
+    бота, поэтому его примет любой воркер без общего хранилища. Проверенные токены
+    лежат в LRU: повторный запрос с тем же токеном - поиск в словаре без HMAC.
+    """
+
+    def __init__(self, ttl: int, maxsize: int):
+        self.ttl = ttl
+        self._verified = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._key = hmac.new(b"AstroSession", settings.BOT_TOKEN.get_secret_value().encode(), hashlib.sha256).digest()
+
+    def _sign(self, payload: str) -> str:
+        digest = hmac.new(self._key, payload.encode(), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest[:18]).decode()
+
+    def issue(self, user_id: int) -> str:
+        expires_at = int(time.time()) + self.ttl
+        payload = f"{user_id}.{expires_at}"
+        token = f"{payload}.{self._sign(payload)}"
+        self._verified.set(token, (user_id, expires_at))
+        return token
+
+    def verify(self, token: str) -> int:
+        cached = self._verified.get(token)
+        if cached is not None and cached[1] > time.time():
+            return cached[0]
+
+        # Токен выдан другим воркером или до рестарта: проверяем подпись один раз
+        try:
+            user_id, expires_at, signature = token.split(".")
+            payload = f"{user_id}.{expires_at}"
+            valid = same_digest(signature, self._sign(payload)) and int(expires_at) > time.time()
+        except (ValueError, TypeError):
+            valid = False
+        if not valid:
+            raise unauthorized()
+
+        self._verified.set(token, (int(user_id), int(expires_at)))
+        return int(user_id)
+
+
+sessions = SessionStore(ttl=settings.SESSION_TTL, maxsize=settings.SESSION_CACHE_SIZE)
+
+
+# --- ЗАВИСИМОСТИ ---
+def session_user(request: Request) -> int | None:
+    """
+    id пользователя по токену из заголовка "Authorization: Bearer" или None, если его нет.
+    В query токен не принимаем: он менял бы URL (и ETag-кэш браузера) на каждый запуск
+    и оседал бы в логах доступа прокси.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return sessions.verify(token)
+
+
+def authorized(model: type[M], anonymous: bool = False) -> Callable[[Request], Awaitable[M]]:
+    """
+    Depends(authorized(Model)): тело как в json_body, но user_id в нем заменяется
+    пользователем из сессии. Без токена - 401, а с anonymous=True (аффирмация) -
+    анонимный запрос с user_id=None. AUTH_REQUIRED=False оставляет user_id клиента.
+    """
+    parse = json_body(model)
+
+    async def dependency(request: Request) -> M:
+        user_id = session_user(request)
+        if user_id is None and settings.AUTH_REQUIRED and not anonymous:
+            raise unauthorized()
+        body = await parse(request)
+        if user_id is not None or settings.AUTH_REQUIRED:
+            body.user_id = user_id
+        if body.user_id is None and not anonymous:
+            # AUTH_REQUIRED=False, но ни сессии, ни user_id в теле - неизвестно, чей запрос
+            raise unauthorized()
+        return body
+
+    return dependency
+
+
+def path_user(user_id: int, request: Request) -> int:
+    """Depends(path_user) для роутов /{user_id}: чужой профиль по сессии не отдаем."""
+    session = session_user(request)
+    if session is None:
+        if settings.AUTH_REQUIRED:
+            raise unauthorized()
+        return user_id
+    if session != user_id:
+        raise HTTPException(status_code=403)
+    return session
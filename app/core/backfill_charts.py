@@ -0,0 +1,43 @@
+import json
+import asyncio
+
+from sqlalchemy import select
+
+from app.core.astro_batch import compute_charts
+from app.core.chart_cache import birth_data, chart_key
+from app.core.database import engine, async_session_factory
+from app.models import User, ChartCacheEntry
+
+BATCH_SIZE = 1000
+
+
+async def main():
+    # Заполняем chart_cache для всех профилей с датой рождения одним пакетным расчетом
+    async with async_session_factory() as db:
+        users = (await db.execute(select(User).where(User.birth_date.is_not(None)))).scalars().all()
+        known = set((await db.execute(select(ChartCacheEntry.key))).scalars())
+
+    rows = {}
+    for user in users:
+        data = birth_data(user)
+        key = chart_key(*data)
+        if key not in known:
+            rows[key] = data
+
+    print(f"🪐 Карт к расчету: {len(rows)} (профилей: {len(users)})")
+    keys = list(rows)
+    for i in range(0, len(keys), BATCH_SIZE):
+        chunk = keys[i:i + BATCH_SIZE]
+        charts = await asyncio.to_thread(compute_charts, [rows[k] for k in chunk])
+        async with async_session_factory() as db:
+            db.add_all(
+                ChartCacheEntry(key=key, planets=json.dumps(charts.planets(j)))
+                for j, key in enumerate(chunk)
+            )
+            await db.commit()
+
+    print("✅ Кэш карт заполнен.")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
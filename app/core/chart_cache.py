@@ -0,0 +1,94 @@
+import json
+import logging
+from datetime import time
+
+from sqlalchemy.exc import IntegrityError
+
+from app.core.astro import compute_planets
+from app.core.astro_engine import astro_engine
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.core.metrics import cache_hit, span
+from app.core.geo import DEFAULT_COORDS, place_index, utc_offset
+from app.models import ChartCacheEntry
+
+logger = logging.getLogger(__name__)
+
+# Карта зависит только от даты, времени, пояса и координат,
+# поэтому одна запись обслуживает всех, кто родился в тот же день в том же городе
+_memory = TTLCache(maxsize=settings.CHART_CACHE_SIZE, ttl=settings.CHART_CACHE_TTL)
+
+
+def chart_key(b_date: str, b_time: str, utcoffset: str, lat: float, lon: float) -> str:
+    return f"{b_date}|{b_time}|{utcoffset}|{lat:.4f}|{lon:.4f}"
+
+
+def birth_data(user) -> tuple[str, str, str, float, float]:
+    """(дата, время, смещение UTC, широта, долгота) в формате flatlib."""
+    lat, lon, tz = user.birth_lat, user.birth_lon, user.birth_tz
+    if lat is None or lon is None:
+        # Старые профили без сохраненных координат - резолвим на лету
+        place = place_index.resolve(user.birth_place) if user.birth_place else None
+        lat, lon, tz = (place.lat, place.lon, place.tz) if place else (*DEFAULT_COORDS, None)
+
+    birth_time = user.birth_time or time(12, 0)
+    return (
+        user.birth_date.strftime("%Y/%m/%d"),
+        birth_time.strftime("%H:%M"),
+        utc_offset(tz, user.birth_date, birth_time),
+        lat,
+        lon,
+    )
+
+
+async def _load_persistent(key: str) -> list[dict] | None:
+    async with async_session_factory() as db:
+        entry = await db.get(ChartCacheEntry, key)
+        return json.loads(entry.planets) if entry else None
+
+
+async def _save_persistent(key: str, planets: list[dict]) -> None:
+    # Отдельная сессия, чтобы не трогать транзакцию вызывающего хендлера
+    async with async_session_factory() as db:
+        db.add(ChartCacheEntry(key=key, planets=json.dumps(planets)))
+        try:
+            await db.commit()
+        except IntegrityError:
+            # Параллельный запрос уже сохранил ту же карту
+            await db.rollback()
+
+
+async def get_planets(user) -> list[dict]:
+    return await get_chart(*birth_data(user))
+
+
+async def get_chart(b_date: str, b_time: str, utcoffset: str, lat: float, lon: float) -> list[dict]:
+    """Позиции планет на момент и место: память процесса, затем таблица chart_cache, затем расчет."""
+    key = chart_key(b_date, b_time, utcoffset, lat, lon)
+
+    planets = _memory.get(key)
+    cache_hit("chart_memory", planets is not None)
+    if planets is not None:
+        return planets
+
+    if settings.CHART_CACHE_PERSIST:
+        try:
+            with span("db"):
+                planets = await _load_persistent(key)
+            cache_hit("chart_db", planets is not None)
+        except Exception as e:
+            logger.warning(f"Chart cache read error: {e}")
+
+    if planets is None:
+        # ТЯЖЕЛЫЙ РАСЧЕТ УХОДИТ В ПУЛ ПРОЦЕССОВ, ЧТОБЫ НЕ БЛОКИРОВАТЬ СЕРВЕР
+        planets = await astro_engine.submit(compute_planets, b_date, b_time, lat, lon, utcoffset)
+        if settings.CHART_CACHE_PERSIST:
+            try:
+                with span("commit"):
+                    await _save_persistent(key, planets)
+            except Exception as e:
+                logger.warning(f"Chart cache write error: {e}")
+
+    _memory.set(key, planets)
+    return planets
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from app.core.config import settings
+from app.core.database import async_session_factory
+
+if TYPE_CHECKING:
+    from aiogram import Bot, Dispatcher
+    from openai import AsyncOpenAI
+
+# --- ЛЕНИВЫЕ КЛИЕНТЫ ---
+# Каждый процесс (воркер uvicorn, бот, фоновые задачи) создает клиентов сам
+# при первом обращении, а не на импорте: так форк/спавн воркеров не тащит
+# чужие сокеты, а процессам без бота не нужен Telegram. SDK (aiogram - это
+# секунды на старте, openai - сотни мс) импортируются там же.
+_openai: AsyncOpenAI | None = None
+_bot: Bot | None = None
+_dp: Dispatcher | None = None
+_update_runner = None
+
+
+def get_openai() -> AsyncOpenAI:
+    global _openai
+    if _openai is None:
+        from openai import AsyncOpenAI
+
+        # Повторы и таймауты делает llm_guard, встроенные повторы SDK отключаем
+        _openai = AsyncOpenAI(api_key=settings.OPENAI_API_KEY.get_secret_value(),
+                              max_retries=0, timeout=settings.LLM_ATTEMPT_TIMEOUT)
+    return _openai
+
+
+def get_bot() -> Bot:
+    global _bot
+    if _bot is None:
+        from aiogram import Bot
+        from aiogram.client.session.aiohttp import AiohttpSession
+
+        _bot = Bot(token=settings.BOT_TOKEN.get_secret_value(), session=AiohttpSession())
+    return _bot
+
+
+def get_dispatcher() -> Dispatcher:
+    global _dp
+    if _dp is None:
+        from aiogram import Dispatcher
+        from app.bot.handlers import start
+        from app.bot.middlewares.db import DbSessionMiddleware
+        from app.bot.middlewares.metrics import MetricsMiddleware
+
+        _dp = Dispatcher()
+        # Метрики снаружи, чтобы в замер попало и открытие сессии БД
+        _dp.update.outer_middleware(MetricsMiddleware())
+        _dp.update.middleware(DbSessionMiddleware(session_pool=async_session_factory))
+        _dp.include_router(start.router)
+    return _dp
+
+
+def get_update_runner():
+    global _update_runner
+    if _update_runner is None:
+        from app.bot.webhook import UpdateRunner
+
+        _update_runner = UpdateRunner(get_dispatcher(), max_concurrency=settings.WEBHOOK_MAX_CONCURRENCY,
+                                      max_pending=settings.WEBHOOK_MAX_PENDING)
+    return _update_runner
+
+
+async def close_clients():
+    global _openai, _bot, _dp, _update_runner
+    if _update_runner is not None:
+        await _update_runner.drain()
+    if _bot is not None:
+        await _bot.session.close()
+    if _openai is not None:
+        await _openai.close()
+    _openai = _bot = _dp = _update_runner = None
@@ -0,0 +1,43 @@
+from typing import Awaitable, Callable, TypeVar
+
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ValidationError
+
+try:
+    import orjson  # Опциональная зависимость: без нее остается stdlib json
+except ImportError:
+    orjson = None
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def json_body(model: type[M]) -> Callable[[Request], Awaitable[M]]:
+    """
+    Depends(json_body(Model)): валидирует сырые байты тела сразу в модель.
+    Мини-апп шлет JSON без Content-Type (чтобы не было preflight), поэтому
+    штатный разбор FastAPI не подходит. Битое тело - единообразный 422.
+    """
+    async def parse(request: Request) -> M:
+        body = await request.body()
+        try:
+            return model.model_validate_json(body or b"{}")
+        except ValidationError as e:
+            raise RequestValidationError(e.errors(include_url=False, include_context=False), body=body)
+
+    return parse
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Модели pydantic сериализуются их собранным на импорте сериализатором
+    (сразу в bytes, без dict и jsonable_encoder), остальное - через orjson.
+    """
+
+    def render(self, content) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        if orjson is not None:
+            return orjson.dumps(content)
+        return super().render(content)
@@ -1,14 +1,99 @@
-from pydantic_settings import BaseSettings
-from pydantic import SecretStr
-
-class Settings(BaseSettings):
-    BOT_TOKEN: SecretStr
-    OPENAI_API_KEY: SecretStr
-    ADMIN_ID: int
-    DATABASE_URL: str
-
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-
+from pydantic_settings import BaseSettings
+from pydantic import SecretStr
+
+class Settings(BaseSettings):
+    BOT_TOKEN: SecretStr
+    OPENAI_API_KEY: SecretStr
+    ADMIN_ID: int
+    DATABASE_URL: str
+
+    # Роль процесса: "all" (API и бот в одном процессе), "api", "bot" или "worker"
+    APP_ROLE: str = "all"
+    API_HOST: str = "0.0.0.0"
+    API_PORT: int = 8000
+    API_WORKERS: int = 1                   # Процессов uvicorn для роли api (больше 1 - только с USER_CACHE_BACKEND=redis)
+
+    # Режим бота: "polling" (один процесс) или "webhook" (можно много воркеров)
+    BOT_MODE: str = "polling"
+    WEBHOOK_URL: str | None = None         # Публичный адрес API, например https://api.stateofbrain.ru (обязателен для webhook)
+    WEBHOOK_PATH: str = "/bot/webhook"
+    WEBHOOK_SECRET: SecretStr | None = None  # Обязателен для webhook: без него API не стартует
+    WEBHOOK_MAX_CONCURRENCY: int = 32      # Апдейтов в обработке одновременно
+    WEBHOOK_MAX_PENDING: int = 1000        # Сверх этого отвечаем 503, Telegram повторит
+
+    # Кэш натальных карт
+    CHART_CACHE_SIZE: int = 10000          # Записей в памяти процесса
+    CHART_CACHE_TTL: int = 7 * 24 * 3600   # Секунд жизни записи в памяти
+    CHART_CACHE_PERSIST: bool = True       # Хранить карты в таблице chart_cache
+
+    # Пул процессов для расчетов flatlib
+    ASTRO_WORKERS: int = 2                 # Процессов в пуле
+    ASTRO_QUEUE_SIZE: int = 32             # Сколько расчетов может ждать сверх занятых воркеров
+    ASTRO_TIMEOUT: float = 5.0             # Дедлайн одного расчета, сек
+
+    # Кэш генераций OpenAI в памяти
+    GENERATION_CACHE_SIZE: int = 5000
+    GENERATION_CACHE_TTL: int = 24 * 3600
+
+    # Общий кэш ответов по нормализованному промпту (см. app/core/prompt_cache.py)
+    PROMPT_CACHE_SIZE: int = 5000          # Ключей (промпт + дата) в памяти
+    PROMPT_CACHE_TTL: int = 24 * 3600
+    PROMPT_CACHE_VARIANTS: int = 3         # Разных ответов на ключ (0 - кэш выключен)
+
+    # Сколько вариантов трактовки держать на каждое число пути
+    NUMEROLOGY_VARIANTS: int = 5
+
+    # Кэш профилей пользователей: "memory" или "redis"
+    USER_CACHE_BACKEND: str = "memory"
+    USER_CACHE_SIZE: int = 20000
+    USER_CACHE_TTL: int = 300
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Пакетная запись аналитики
+    ANALYTICS_BATCH_SIZE: int = 500
+    ANALYTICS_FLUSH_INTERVAL: float = 2.0  # Сек между сбросами пачки
+    ANALYTICS_QUEUE_SIZE: int = 10000
+    ANALYTICS_SPILL_PATH: str = "analytics_spill.jsonl"
+
+    # Вызовы OpenAI (см. app/core/llm_guard.py)
+    LLM_MAX_CONCURRENCY: int = 64          # Одновременных запросов к OpenAI на процесс
+    LLM_ATTEMPT_TIMEOUT: float = 12.0      # Таймаут одной попытки, сек
+    LLM_RETRIES: int = 2                   # Повторов при сетевых сбоях и 5xx
+    LLM_RETRY_BACKOFF: float = 0.5         # База экспоненциальной паузы, сек
+    LLM_HEDGE_PERCENTILE: float = 95.0     # Хедж-запрос после этого перцентиля задержки (0 - выкл.)
+    LLM_BREAKER_FAILURES: int = 5          # Неудач подряд до размыкания
+    LLM_BREAKER_COOLDOWN: float = 30.0     # Сек без запросов к OpenAI после размыкания
+
+    # Допуск к дорогим эндпоинтам (см. app/core/ratelimit.py): token bucket на
+    # пользователя и на IP ("memory" или "redis" - общий для всех воркеров)
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_USER_RATE: float = 0.2      # Токенов в секунду на user_id (12 в минуту)
+    RATE_LIMIT_USER_BURST: int = 10        # Емкость корзины: сколько запросов подряд можно сразу
+    RATE_LIMIT_IP_RATE: float = 1.0        # На IP шире: за одним NAT бывает много пользователей
+    RATE_LIMIT_IP_BURST: int = 30
+    RATE_LIMIT_CONCURRENCY: int = 128      # Дорогих запросов в обработке на процесс, сверх - 429
+
+    # Сессии мини-аппа (см. app/core/auth.py): initData проверяется один раз,
+    # дальше клиент ходит с коротким подписанным токеном
+    AUTH_REQUIRED: bool = True             # False - без токена доверять user_id из запроса (локальная разработка)
+    INIT_DATA_MAX_AGE: int = 24 * 3600     # Насколько старый initData еще принимаем, сек
+    SESSION_TTL: int = 3600                # Время жизни токена сессии, сек
+    SESSION_CACHE_SIZE: int = 50000        # Проверенных токенов в памяти процесса
+
+    # Метрики /metrics и сэмплирующий профайлер /metrics/profile. По умолчанию выключены;
+    # включенные отвечают только с токеном (Authorization: Bearer), а без токена - только localhost
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: SecretStr | None = None
+    PROFILER_ENABLED: bool = False
+
+    # Ночная предгенерация прогнозов
+    PREGEN_ACTIVE_DAYS: int = 7            # Кого считаем активным
+    PREGEN_CONCURRENCY: int = 8            # Одновременных запросов к OpenAI
+    PREGEN_BATCH_SIZE: int = 200           # Строк в одном bulk UPDATE
+    PREGEN_HOUR: int = 4                   # Во сколько (UTC) роль worker запускает предгенерацию
+
+    class Config:
+        env_file = ".env"
+        env_file_encoding = "utf-8"
+
 settings = Settings()
\ No newline at end of file
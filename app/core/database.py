@@ -1,23 +1,31 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy.orm import DeclarativeBase
-from app.core.config import settings
-
-# Оптимизация
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=False,
-    pool_pre_ping=True,  # Переподключаться, если соединение отпало
-    pool_size=10,        # Держим 10 соединений
-    max_overflow=20      # Максимум 20 при нагрузке
-)
-
-async_session_factory = async_sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
-)
-
-class Base(DeclarativeBase):
-    pass
-
-async def get_db():
-    async with async_session_factory() as session:
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import DeclarativeBase
+from app.core.config import settings
+
+# Оптимизация
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=False,
+    pool_pre_ping=True,  # Переподключаться, если соединение отпало
+    pool_size=10,        # Держим 10 соединений
+    max_overflow=20      # Максимум 20 при нагрузке
+)
+
+async_session_factory = async_sessionmaker(
+    engine, class_=AsyncSession, expire_on_commit=False
+)
+
+class Base(DeclarativeBase):
+    pass
+
+def dialect_insert(table):
+    """INSERT с поддержкой ON CONFLICT для текущей БД (Postgres в проде, SQLite в тестах)."""
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+async def get_db():
+    async with async_session_factory() as session:
         yield session
\ No newline at end of file
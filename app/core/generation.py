@@ -0,0 +1,81 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import cache_hit, cache_requests
+
+
+class GenerationLayer:
+    """
+    Слой над платными генерациями OpenAI.
+    - Одинаковые параллельные запросы (двойной тап) ждут одну общую генерацию.
+    - Готовые ответы живут в ограниченном кэше в памяти перед колонками User.
+    Ключ: (user_id, эндпоинт, дата или хэш входных данных).
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+
+    def get(self, key: Hashable) -> str | None:
+        return self._cache.get(key)
+
+    def remember(self, key: Hashable, text: str) -> None:
+        self._cache.set(key, text)
+
+    async def wait(self, key: Hashable) -> str | None:
+        """Готовый текст из кэша или из генерации в полете; None - ни того ни другого (или она не удалась)."""
+        cached = self._cache.get(key)
+        if cached is not None:
+            cache_hit("generation", True)
+            return cached
+
+        future = self._in_flight.get(key)
+        if future is None:
+            return None
+        cache_requests.inc(cache="generation", result="coalesced")
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            return None
+
+    def claim(self, key: Hashable) -> asyncio.Future:
+        """
+        Генерация, которую ведет SSE-стрим: параллельные run()/wait() по ключу ждут ее.
+        Владелец обязан завершить future текстом или None (стрим не удался).
+        """
+        cache_hit("generation", False)
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        future.add_done_callback(lambda f: self._on_done(key, f))
+        return future
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[str]]) -> str:
+        cached = self._cache.get(key)
+        if cached is not None:
+            cache_hit("generation", True)
+            return cached
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            cache_requests.inc(cache="generation", result="coalesced")
+        else:
+            cache_hit("generation", False)
+            future = asyncio.ensure_future(factory())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda f: self._on_done(key, f))
+
+        # shield: отмена одного клиента не должна убивать общую генерацию
+        return await asyncio.shield(future)
+
+    def _on_done(self, key: Hashable, future: asyncio.Future) -> None:
+        self._in_flight.pop(key, None)
+        if not future.cancelled() and future.exception() is None and future.result() is not None:
+            self._cache.set(key, future.result())
+
+
+generation = GenerationLayer(
+    maxsize=settings.GENERATION_CACHE_SIZE,
+    ttl=settings.GENERATION_CACHE_TTL,
+)
@@ -0,0 +1,184 @@
+import re
+import bisect
+import logging
+from array import array
+from dataclasses import dataclass
+from datetime import date, time, datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+PLACES_PATH = Path(__file__).resolve().parent.parent / "data" / "places.tsv"
+
+# Куда падаем, если место не нашлось (как раньше - Лондон)
+DEFAULT_COORDS = (51.50, -0.12)
+
+_TRANSLIT = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e", "ж": "zh",
+    "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o",
+    "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts",
+    "ч": "ch", "ш": "sh", "щ": "shch", "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu",
+    "я": "ya", "і": "i", "ї": "yi", "є": "ye", "ґ": "g", "ў": "u", "ә": "a", "ө": "o",
+    "ү": "u", "ұ": "u", "қ": "k", "ғ": "g", "ң": "n", "һ": "h",
+    "ü": "u", "ö": "o", "ä": "a", "ș": "s", "ş": "s", "ı": "i", "ã": "a", "é": "e",
+    "è": "e", "ø": "o", "å": "a", "ç": "c",
+}
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(name: str) -> str:
+    """'Санкт-Петербург', 'sankt peterburg' и 'САНКТ ПЕТЕРБУРГ' дают один ключ."""
+    text = "".join(_TRANSLIT.get(ch, ch) for ch in name.lower().strip())
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def _trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True)
+class Place:
+    name: str
+    country: str
+    lat: float
+    lon: float
+    tz: str
+
+
+class PlaceIndex:
+    """
+    Офлайн-индекс мест рождения.
+    Данные лежат в плоских массивах (array), ключи - в отсортированном списке,
+    поэтому загрузка быстрая, а поиск по префиксу - это bisect.
+    Триграммный индекс для опечаток строится только при первой неточной выдаче.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._loaded = False
+
+    def _load(self) -> None:
+        names: list[str] = []
+        countries: list[str] = []
+        tz_names: list[str] = []
+        tz_ids: dict[str, int] = {}
+        lats, lons = array("d"), array("d")
+        populations, place_tz = array("q"), array("H")
+        pairs: list[tuple[str, int]] = []
+
+        with self.path.open(encoding="utf-8") as f:
+            for line in f:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                name, ascii_name, alt_names, lat, lon, country, population, tz = line.rstrip("\n").split("\t")
+                idx = len(names)
+                names.append(name)
+                countries.append(country)
+                lats.append(float(lat))
+                lons.append(float(lon))
+                populations.append(int(population or 0))
+                place_tz.append(tz_ids.setdefault(tz, len(tz_ids)))
+                if len(tz_ids) > len(tz_names):
+                    tz_names.append(tz)
+
+                variants = {name, ascii_name, *alt_names.split(",")}
+                for key in {normalize(v) for v in variants if v}:
+                    if key:
+                        pairs.append((key, idx))
+
+        pairs.sort()
+        self._keys = [key for key, _ in pairs]
+        self._key_place = array("I", (idx for _, idx in pairs))
+        self._names, self._countries, self._tz_names = names, countries, tz_names
+        self._lats, self._lons = lats, lons
+        self._populations, self._place_tz = populations, place_tz
+        self._trigram_index: dict[str, array] | None = None
+        self._loaded = True
+        logger.info(f"🌍 Place index loaded: {len(names)} places, {len(pairs)} names")
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self._load()
+
+    def _place(self, idx: int) -> Place:
+        return Place(
+            name=self._names[idx], country=self._countries[idx],
+            lat=self._lats[idx], lon=self._lons[idx],
+            tz=self._tz_names[self._place_tz[idx]],
+        )
+
+    def _prefix_matches(self, key: str) -> list[int]:
+        start = bisect.bisect_left(self._keys, key)
+        found = []
+        for i in range(start, len(self._keys)):
+            if not self._keys[i].startswith(key):
+                break
+            found.append(self._key_place[i])
+        return found
+
+    def _fuzzy_matches(self, key: str, min_score: float = 0.35) -> list[int]:
+        if self._trigram_index is None:
+            index: dict[str, array] = {}
+            for i, k in enumerate(self._keys):
+                for gram in _trigrams(k):
+                    index.setdefault(gram, array("I")).append(i)
+            self._trigram_index = index
+
+        query = _trigrams(key)
+        shared: dict[int, int] = {}
+        for gram in query:
+            for i in self._trigram_index.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+
+        best: dict[int, float] = {}
+        for i, count in shared.items():
+            score = count / (len(query) + len(_trigrams(self._keys[i])) - count)
+            if score >= min_score:
+                idx = self._key_place[i]
+                best[idx] = max(best.get(idx, 0.0), score)
+        return sorted(best, key=lambda idx: (-best[idx], -self._populations[idx]))
+
+    def _by_population(self, indices: list[int]) -> list[int]:
+        return sorted(set(indices), key=lambda idx: -self._populations[idx])
+
+    def search(self, query: str, limit: int = 7) -> list[Place]:
+        """Автодополнение: сначала по префиксу, при пустой выдаче - по триграммам."""
+        self._ensure_loaded()
+        key = normalize(query)
+        if not key:
+            return []
+        indices = self._by_population(self._prefix_matches(key))
+        if not indices and len(key) >= 3:
+            indices = self._fuzzy_matches(key)
+        return [self._place(idx) for idx in indices[:limit]]
+
+    def resolve(self, query: str) -> Place | None:
+        """Лучшее совпадение для сохраненного названия места."""
+        self._ensure_loaded()
+        key = normalize(query)
+        if not key:
+            return None
+
+        i = bisect.bisect_left(self._keys, key)
+        exact = []
+        while i < len(self._keys) and self._keys[i] == key:
+            exact.append(self._key_place[i])
+            i += 1
+
+        indices = self._by_population(exact) or self._fuzzy_matches(key, min_score=0.4)
+        return self._place(indices[0]) if indices else None
+
+
+place_index = PlaceIndex(PLACES_PATH)
+
+
+def utc_offset(tz: str | None, birth_date: date, birth_time: time) -> str:
+    """Смещение от UTC на момент рождения (с учетом исторических правил зоны) в формате '+03:00'."""
+    if not tz:
+        return "+00:00"
+    offset = ZoneInfo(tz).utcoffset(datetime.combine(birth_date, birth_time))
+    minutes = int(offset.total_seconds() // 60)
+    sign = "+" if minutes >= 0 else "-"
+    return f"{sign}{abs(minutes) // 60:02d}:{abs(minutes) % 60:02d}"
@@ -0,0 +1,166 @@
+import gzip
+import hashlib
+import sys
+from mimetypes import guess_type
+from pathlib import Path
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.staticfiles import StaticFiles
+
+try:
+    import brotli  # Опциональная зависимость: без нее только gzip
+except ImportError:
+    brotli = None
+
+# Профиль и карта меняются только при правке профиля (или со сменой дня),
+# поэтому клиент хранит ответ, но каждый раз перепроверяет его по ETag
+REVALIDATE = "private, no-cache"
+NO_STORE = "no-store"
+UPLOADS_CACHE = "public, max-age=86400"
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+PRECOMPRESS_SUFFIXES = {".js", ".css", ".html", ".svg", ".json", ".txt"}
+
+
+# --- ETAG ---
+def etag_for(*parts) -> str:
+    # Слабый ETag: сжатое и несжатое представления считаются одним ответом
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == bare for tag in header.split(","))
+
+
+def _pick_encoding(accept_encoding: str) -> str | None:
+    accepted = {part.split(";")[0].strip() for part in accept_encoding.lower().split(",")}
+    if "br" in accepted and brotli is not None:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=4)  # Баланс CPU/размер для динамики
+    return gzip.compress(body, compresslevel=6)
+
+
+# --- СЖАТИЕ ОТВЕТОВ ---
+class CompressionMiddleware:
+    """
+    gzip/brotli для ответов, пришедших одним куском (JSON API).
+    Стримы вроде SSE и уже сжатые ответы проходят как есть, без буферизации.
+    """
+
+    def __init__(self, app, minimum_size: int = 512):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = _pick_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start_message = None
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if start_message is None:
+                # Заголовки уже ушли - дальше просто проксируем
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            if (
+                not message.get("more_body", False)
+                and len(body) >= self.minimum_size
+                and "content-encoding" not in headers
+                and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            ):
+                body = _compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+                message = {**message, "body": body}
+
+            await send(start_message)
+            start_message = None
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+# --- СТАТИКА ---
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles, который отдает готовые file.br / file.gz рядом с оригиналом
+    (если клиент их принимает) и ставит Cache-Control. ETag и 304 - штатные.
+    """
+
+    def __init__(self, *args, cache_control: str = UPLOADS_CACHE, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = cache_control
+
+    async def get_response(self, path: str, scope):
+        accept = Headers(scope=scope).get("accept-encoding", "").lower()
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if encoding not in accept:
+                continue
+            try:
+                response = await super().get_response(path + suffix, scope)
+            except HTTPException:
+                continue
+            if response.status_code in (200, 304):
+                media_type = guess_type(path)[0] or "application/octet-stream"
+                if media_type.startswith("text/"):
+                    media_type += "; charset=utf-8"
+                response.headers["Content-Type"] = media_type
+                response.headers["Content-Encoding"] = encoding
+                response.headers.add_vary_header("Accept-Encoding")
+                response.headers["Cache-Control"] = self.cache_control
+                return response
+
+        response = await super().get_response(path, scope)
+        response.headers["Cache-Control"] = self.cache_control
+        return response
+
+
+def precompress(directory: str, minimum_size: int = 512) -> int:
+    """Кладет .gz (и .br при наличии brotli) рядом с текстовыми файлами каталога."""
+    written = 0
+    for path in Path(directory).rglob("*"):
+        if not path.is_file() or path.suffix not in PRECOMPRESS_SUFFIXES:
+            continue
+        data = path.read_bytes()
+        if len(data) < minimum_size:
+            continue
+        path.with_name(path.name + ".gz").write_bytes(gzip.compress(data, compresslevel=9))
+        written += 1
+        if brotli is not None:
+            path.with_name(path.name + ".br").write_bytes(brotli.compress(data, quality=11))
+            written += 1
+    return written
+
+
+if __name__ == "__main__":
+    # python -m app.core.http_cache app/frontend - перед выкладкой фронта
+    # (nginx отдает их через gzip_static / brotli_static, uploads - PrecompressedStaticFiles)
+    for target in sys.argv[1:] or ["app/frontend"]:
+        print(f"📦 {target}: {precompress(target)} файлов")
@@ -1,16 +1,48 @@
-import asyncio
-from app.core.database import engine, Base
-from app.models import User, AnalyticsEvent, Transaction
-
-async def main():
-    async with engine.begin() as conn:
-        print("♻️ Обновляю структуру базы данных...")
-        # Drop all удалит данные! Если не хочешь терять - используй ALTER TABLE вручную или Alembic
-        await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
-        print("✅ База данных готова к кэшированию.")
-
-    await engine.dispose()
-
-if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+import argparse
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+def alembic_config() -> Config:
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "migrations"))
+    return config
+
+
+def reset(config: Config):
+    # Пересоздание с нуля (только для локальной разработки): все данные удаляются
+    import asyncio
+    from app.core.database import engine, Base
+    import app.models  # noqa: F401
+
+    async def recreate():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        await engine.dispose()
+
+    asyncio.run(recreate())
+    command.stamp(config, "head")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Миграции схемы базы данных")
+    parser.add_argument("--reset", action="store_true", help="удалить все таблицы и создать схему заново")
+    args = parser.parse_args()
+
+    config = alembic_config()
+    if args.reset:
+        print("♻️ Пересоздаю базу данных...")
+        reset(config)
+    else:
+        print("♻️ Накатываю миграции...")
+        command.upgrade(config, "head")
+    print("✅ База данных готова.")
+
+
+if __name__ == "__main__":
+    main()
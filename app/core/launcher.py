@@ -0,0 +1,175 @@
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import uvicorn
+
+from app.core.config import settings
+
+# Запуск по ролям:
+#   python -m app.core.launcher api --workers 4   # HTTP API в N процессах uvicorn
+#   python -m app.core.launcher bot               # единственный владелец polling
+#   python -m app.core.launcher worker            # прогрев нумерологии и ночная предгенерация
+#   python -m app.core.launcher all --workers 4   # все роли отдельными процессами
+# Роль передается дочерним процессам через APP_ROLE, поэтому воркеры API
+# никогда не запускают polling сами.
+
+logger = logging.getLogger(__name__)
+
+ROLES = ("api", "bot", "worker", "all")
+
+
+# --- API ---
+def set_role(role: str):
+    # settings уже прочитаны в этом процессе, а дочерние возьмут роль из окружения
+    os.environ["APP_ROLE"] = role
+    settings.APP_ROLE = role
+
+
+def require_shared_cache(workers: int):
+    # Кэш профилей "memory" у каждого процесса свой: после сохранения профиля на одном
+    # воркере остальные до USER_CACHE_TTL отдавали бы старый профиль и старый ETag
+    if workers > 1 and settings.USER_CACHE_BACKEND != "redis":
+        raise SystemExit(
+            f"API с {workers} воркерами требует USER_CACHE_BACKEND=redis "
+            f"(сейчас {settings.USER_CACHE_BACKEND!r}): запустите с --workers 1 или настройте Redis"
+        )
+
+
+def run_api(workers: int):
+    require_shared_cache(workers)
+    set_role("api")
+    # Строка импорта обязательна для workers > 1: каждый процесс импортирует
+    # приложение сам и создает клиентов в своем lifespan
+    uvicorn.run("app.core.main:app", host=settings.API_HOST, port=settings.API_PORT, workers=workers)
+
+
+# --- БОТ ---
+async def run_bot():
+    from app.core.analytics import analytics_sink
+    from app.core.clients import get_bot, get_dispatcher, close_clients
+    from app.core.database import engine
+
+    if settings.BOT_MODE == "webhook":
+        # Апдейты принимают воркеры API, отдельный процесс не нужен
+        logger.warning("BOT_MODE=webhook: роль bot не нужна, апдейты обрабатывает API")
+        return
+
+    await analytics_sink.start()
+    bot = get_bot()
+    try:
+        await bot.delete_webhook(drop_pending_updates=True)
+        await get_dispatcher().start_polling(bot)
+    finally:
+        await close_clients()
+        await analytics_sink.stop()
+        await engine.dispose()
+
+
+# --- ФОНОВЫЕ ЗАДАЧИ ---
+def seconds_until(hour: int) -> float:
+    now = datetime.now(timezone.utc)
+    run_at = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    return (run_at - now).total_seconds()
+
+
+async def warm_numerology(client) -> None:
+    from app.core.numerology import numerology_store
+
+    # Пул нумерологии - оптимизация, а не условие работы: без него первый запрос сам
+    # ждет генерацию. Сбой OpenAI или БД на старте не должен ронять воркер, а с ним
+    # (через run_all) API и бота - просто повторим перед следующим ночным прогоном
+    try:
+        generated = await numerology_store.warm_up(client)
+        logger.info(f"🔢 Нумерология прогрета, новых вариантов: {generated}")
+    except Exception:
+        logger.exception("Numerology warm-up failed, retrying before the next pregeneration")
+
+
+async def run_worker():
+    from app.core.astro_engine import astro_engine
+    from app.core.clients import get_openai, close_clients
+    from app.core.database import engine
+    from app.core.pregenerate import pregenerate
+
+    client = get_openai()
+    try:
+        await warm_numerology(client)
+
+        while True:
+            await asyncio.sleep(seconds_until(settings.PREGEN_HOUR))
+            await warm_numerology(client)  # Дозаполняет только недостающие варианты
+            try:
+                done = await pregenerate(client, date.today())
+                logger.info(f"🌅 Предгенерация: обновлено пользователей {done}")
+            except Exception:
+                logger.exception("Pregeneration failed")
+    finally:
+        await close_clients()
+        astro_engine.shutdown()  # Пул поднимается при первом расчете транзитов/карт
+        await engine.dispose()
+
+
+# --- ВСЕ РОЛИ ---
+def run_all(workers: int):
+    require_shared_cache(workers)  # До запуска остальных ролей, а не в дочернем api
+    roles = ["api", "worker"]
+    if settings.BOT_MODE != "webhook":
+        roles.append("bot")
+
+    procs = {}
+    for role in roles:
+        cmd = [sys.executable, "-m", "app.core.launcher", role]
+        if role == "api":
+            cmd += ["--workers", str(workers)]
+        procs[role] = subprocess.Popen(cmd, env={**os.environ, "APP_ROLE": role})
+        logger.info(f"▶️ {role}: pid {procs[role].pid}")
+
+    def stop(*_):
+        for proc in procs.values():
+            if proc.poll() is None:
+                proc.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        # Падение любой роли останавливает остальные, перезапуск — забота systemd/докера
+        while all(proc.poll() is None for proc in procs.values()):
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop()
+        for proc in procs.values():
+            proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Astro: запуск по ролям")
+    parser.add_argument("role", choices=ROLES)
+    parser.add_argument("--workers", type=int, default=settings.API_WORKERS,
+                        help="процессов uvicorn для роли api (по умолчанию API_WORKERS)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.role == "api":
+        run_api(args.workers)
+    elif args.role == "bot":
+        set_role("bot")
+        asyncio.run(run_bot())
+    elif args.role == "worker":
+        set_role("worker")
+        asyncio.run(run_worker())
+    else:
+        run_all(args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, AsyncIterator
+
+from app.core.llm_guard import llm_guard
+from app.core.metrics import span
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI  # SDK грузится только вместе с клиентом (app.core.clients)
+
+MODEL = "gpt-4.1-mini-2025-04-14"
+
+# Дедлайн на весь вызов с повторами, сек (для стримов - до первого чанка)
+DEADLINES = {
+    "advice": 10.0,
+    "natal": 15.0,
+    "numerology": 20.0,
+    "affirmation": 10.0,
+}
+
+# --- ПРОМПТЫ ---
+ADVICE_PROMPT = "Ты мистический астролог. Дай короткий совет на день (макс 20 слов) с эмодзи. Если даны транзиты, опирайся на самый точный аспект."
+NATAL_PROMPT = "Ты профессиональный астролог. Дай краткий (100 слов) психологический портрет. Выдели 'Ядро', 'Эмоции', 'Мышление'. Markdown (жирный)."
+NUMEROLOGY_PROMPT = "Ты нумеролог. Опиши Число Жизненного Пути. Мистически, макс 120 слов, Markdown."
+AFFIRMATION_PROMPT = "Ты духовный наставник. Дай одну мощную, короткую аффирмацию (установку) на сегодня. Темы: уверенность, спокойствие, энергия. Без кавычек."
+
+
+def _messages(system: str, user: str) -> list[dict]:
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user}
+    ]
+
+
+async def _complete(client: AsyncOpenAI, kind: str, system: str, user: str, temperature: float) -> str:
+    async def request():
+        with span("openai"):
+            response = await client.chat.completions.create(
+                model=MODEL,
+                messages=_messages(system, user),
+                temperature=temperature
+            )
+        return response.choices[0].message.content
+
+    return await llm_guard.complete(kind, request, DEADLINES[kind])
+
+
+async def _stream(client: AsyncOpenAI, kind: str, system: str, user: str, temperature: float) -> AsyncIterator[str]:
+    async def open_stream():
+        return await client.chat.completions.create(
+            model=MODEL,
+            messages=_messages(system, user),
+            temperature=temperature,
+            stream=True
+        )
+
+    # Для стрима span покрывает весь ответ, до последнего токена
+    with span("openai"):
+        async for chunk in llm_guard.stream(kind, open_stream, DEADLINES[kind]):
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+def numerology_prefix(life_path_number: int) -> str:
+    # Маркер числа, который фронтенд вырезает и рисует в круге
+    return f"YOUR_NUMBER:{life_path_number}\n\n"
+
+
+def advice_prompt(message: str, sky: str = "") -> str:
+    # sky - транзиты дня из app.core.transits: совет опирается на реальное небо
+    prompt = f"Дай совет. Данные: {message}"
+    if sky:
+        prompt += f"\n{sky}"
+    return prompt
+
+
+async def generate_daily_advice(client: AsyncOpenAI, message: str, sky: str = "") -> str:
+    return await _complete(client, "advice", ADVICE_PROMPT, advice_prompt(message, sky), temperature=0.9)
+
+
+async def generate_natal_analysis(client: AsyncOpenAI, chart_summary: str) -> str:
+    return await _complete(client, "natal", NATAL_PROMPT, f"Проанализируй: {chart_summary}", temperature=0.8)
+
+
+def stream_natal_analysis(client: AsyncOpenAI, chart_summary: str) -> AsyncIterator[str]:
+    return _stream(client, "natal", NATAL_PROMPT, f"Проанализируй: {chart_summary}", temperature=0.8)
+
+
+async def generate_numerology(client: AsyncOpenAI, life_path_number: int) -> str:
+    text = await _complete(client, "numerology", NUMEROLOGY_PROMPT, f"Число пути: {life_path_number}", temperature=0.8)
+    return numerology_prefix(life_path_number) + text
+
+
+def stream_numerology(client: AsyncOpenAI, life_path_number: int) -> AsyncIterator[str]:
+    return _stream(client, "numerology", NUMEROLOGY_PROMPT, f"Число пути: {life_path_number}", temperature=0.8)
+
+
+async def generate_affirmation(client: AsyncOpenAI) -> str:
+    return await _complete(client, "affirmation", AFFIRMATION_PROMPT, "Дай установку.", temperature=1.0)
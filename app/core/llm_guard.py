@@ -0,0 +1,244 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from functools import cache
+from typing import AsyncIterator, Awaitable, Callable, TypeVar
+
+from app.core.config import settings
+from app.core.metrics import llm_calls, llm_hedges, llm_retries
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@cache
+def _retryable() -> tuple[type[BaseException], ...]:
+    # Сбои сети и 5xx имеет смысл повторить; 429 повторять бессмысленно - это квота.
+    # Классы SDK берем при первом вызове, чтобы импорт модуля не тянул openai
+    from openai import APIConnectionError, APITimeoutError, InternalServerError
+    return APITimeoutError, APIConnectionError, InternalServerError, asyncio.TimeoutError
+
+
+@cache
+def _provider_failures() -> tuple[type[BaseException], ...]:
+    return _retryable() + (LLMUnavailable,)
+
+
+@cache
+def _quota_errors() -> tuple[type[BaseException], ...]:
+    from openai import RateLimitError
+    return (RateLimitError,)
+
+
+class LLMUnavailable(Exception):
+    """Провайдер не ответил за дедлайн или breaker открыт - отдаем запасной текст."""
+
+
+class CircuitBreaker:
+    """
+    После N неудачных вызовов подряд перестает ходить в OpenAI на cooldown секунд,
+    затем пропускает один пробный вызов (half-open).
+    """
+
+    def __init__(self, failures: int, cooldown: float):
+        self.failures = failures
+        self.cooldown = cooldown
+        self._count = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self._opened_at is None:
+            return True
+        if time.monotonic() - self._opened_at < self.cooldown or self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def retry_in(self) -> float:
+        """Сколько секунд осталось до пробного вызова; 0 - breaker закрыт или cooldown прошел."""
+        if self._opened_at is None:
+            return 0.0
+        return max(self._opened_at + self.cooldown - time.monotonic(), 0.0)
+
+    def success(self) -> None:
+        if self._opened_at is not None:
+            logger.info("LLM circuit closed")
+        self._count = 0
+        self._opened_at = None
+        self._probing = False
+
+    def abandon(self) -> None:
+        # Пробный вызов отменили (клиент ушел) - следующий запрос станет новой пробой
+        self._probing = False
+
+    def failure(self) -> None:
+        self._count += 1
+        self._probing = False
+        if self._count >= self.failures:
+            if self._opened_at is None:
+                logger.warning(f"LLM circuit opened for {self.cooldown}s")
+            self._opened_at = time.monotonic()
+
+
+class LatencyWindow:
+    """Скользящее окно задержек удачных вызовов для порога хеджирования."""
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self._values: deque[float] = deque(maxlen=size)
+        self.min_samples = min_samples
+
+    def record(self, seconds: float) -> None:
+        self._values.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        if len(self._values) < self.min_samples:
+            return None
+        values = sorted(self._values)
+        return values[min(len(values) - 1, int(len(values) * q / 100))]
+
+
+class LLMGuard:
+    """
+    Общая обертка над вызовами OpenAI:
+    - дедлайн на весь вызов и таймаут на попытку;
+    - повторы с джиттером при сетевых сбоях и 5xx;
+    - хедж-запрос, если ответ не пришел за p-й перцентиль обычной задержки;
+    - circuit breaker и общий лимит одновременных запросов на процесс.
+    """
+
+    def __init__(self, max_concurrency: int, attempt_timeout: float, retries: int, backoff: float,
+                 hedge_percentile: float, breaker_failures: int, breaker_cooldown: float):
+        self.attempt_timeout = attempt_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.hedge_percentile = hedge_percentile
+        self.breaker = CircuitBreaker(breaker_failures, breaker_cooldown)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._latency: dict[str, LatencyWindow] = {}
+
+    def _admit(self, kind: str) -> None:
+        if not self.breaker.allow():
+            llm_calls.inc(kind=kind, outcome="rejected")
+            raise LLMUnavailable("circuit open")
+
+    def _settle(self, kind: str, error: BaseException | None) -> None:
+        if isinstance(error, (asyncio.CancelledError, GeneratorExit)):
+            self.breaker.abandon()
+        elif error is None:
+            self.breaker.success()
+            llm_calls.inc(kind=kind, outcome="ok")
+        elif isinstance(error, _quota_errors()):
+            # 429 - исчерпана квота, а не сбой провайдера: breaker не трогаем, паузу
+            # по Retry-After выдерживает вызывающий (см. pregenerate._generate)
+            self.breaker.abandon()
+            llm_calls.inc(kind=kind, outcome="rate_limited")
+        elif isinstance(error, _provider_failures()):
+            self.breaker.failure()
+            llm_calls.inc(kind=kind, outcome="failed")
+        else:
+            # 400/401 и прочие ошибки запроса - не повод считать провайдера больным
+            self.breaker.success()
+            llm_calls.inc(kind=kind, outcome="error")
+
+    async def _with_retries(self, kind: str, attempt: Callable[[], Awaitable[T]], deadline_at: float) -> T:
+        error: BaseException | None = None
+        for n in range(self.retries + 1):
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                break
+            if n:
+                llm_retries.inc(kind=kind)
+            try:
+                return await asyncio.wait_for(attempt(), min(remaining, self.attempt_timeout))
+            except _retryable() as e:
+                error = e
+                logger.warning(f"LLM {kind} attempt {n + 1} failed: {e!r}")
+            # Full jitter: параллельные запросы не повторяют хором
+            pause = random.uniform(0, self.backoff * 2 ** n)
+            await asyncio.sleep(min(pause, max(deadline_at - time.monotonic(), 0)))
+        raise LLMUnavailable(f"{kind}: no answer within deadline") from error
+
+    async def _attempt(self, kind: str, request: Callable[[], Awaitable[T]]) -> T:
+        async with self._semaphore:
+            started = time.monotonic()
+            result = await request()
+        self._latency.setdefault(kind, LatencyWindow()).record(time.monotonic() - started)
+        return result
+
+    async def _hedged(self, kind: str, request: Callable[[], Awaitable[T]]) -> T:
+        window = self._latency.get(kind)
+        hedge_after = window.percentile(self.hedge_percentile) if window and self.hedge_percentile else None
+        tasks = {asyncio.ensure_future(self._attempt(kind, request))}
+        try:
+            if hedge_after is not None:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+                # Хеджируем, только если есть свободный слот: в брауновут не удваиваем нагрузку
+                if not done and not self._semaphore.locked():
+                    llm_hedges.inc(kind=kind)
+                    tasks.add(asyncio.ensure_future(self._attempt(kind, request)))
+
+            error: BaseException | None = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def complete(self, kind: str, request: Callable[[], Awaitable[T]], deadline: float) -> T:
+        self._admit(kind)
+        try:
+            result = await self._with_retries(kind, lambda: self._hedged(kind, request), time.monotonic() + deadline)
+        except BaseException as e:
+            self._settle(kind, e)
+            raise
+        self._settle(kind, None)
+        return result
+
+    async def stream(self, kind: str, open_stream: Callable[[], Awaitable[AsyncIterator[T]]],
+                     deadline: float) -> AsyncIterator[T]:
+        """
+        Повторы и дедлайн - только до начала стрима; дальше каждый чанк ждем
+        не дольше attempt_timeout. Слот лимитера занят на все время ответа.
+        """
+        self._admit(kind)
+        deadline_at = time.monotonic() + deadline
+        try:
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), deadline)
+            except asyncio.TimeoutError:
+                raise LLMUnavailable(f"{kind}: no free slot") from None
+            try:
+                stream = await self._with_retries(kind, open_stream, deadline_at)
+                chunks = stream.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), self.attempt_timeout)
+                    except StopAsyncIteration:
+                        break
+                    yield chunk
+            finally:
+                self._semaphore.release()
+        except BaseException as e:
+            self._settle(kind, e)
+            raise
+        self._settle(kind, None)
+
+
+llm_guard = LLMGuard(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    attempt_timeout=settings.LLM_ATTEMPT_TIMEOUT,
+    retries=settings.LLM_RETRIES,
+    backoff=settings.LLM_RETRY_BACKOFF,
+    hedge_percentile=settings.LLM_HEDGE_PERCENTILE,
+    breaker_failures=settings.LLM_BREAKER_FAILURES,
+    breaker_cooldown=settings.LLM_BREAKER_COOLDOWN,
+)
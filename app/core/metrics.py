@@ -0,0 +1,177 @@
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter as _Tally
+from contextlib import contextmanager
+
+# Метрики процесса в формате Prometheus без внешних зависимостей.
+# Каждый воркер uvicorn считает свое: при нескольких воркерах /metrics отдает
+# цифры того процесса, который принял запрос скрейпа.
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry: list = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, doc: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.doc = doc
+        self.label_names = labels
+        self._values: dict[tuple, float] = {}
+        _registry.append(self)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(labels.get(n, "") for n in self.label_names)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} counter"]
+        for key, value in self._values.items():
+            lines.append(f"{self.name}{_labels(self.label_names, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, doc: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.doc = doc
+        self.label_names = labels
+        self.buckets = buckets
+        # На каждый набор меток: счетчики по корзинам (+Inf последней), сумма
+        self._values: dict[tuple, tuple[list[int], list[float]]] = {}
+        _registry.append(self)
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(labels.get(n, "") for n in self.label_names)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1][0] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.label_names + ('le',), key + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {total[0]}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- МЕТРИКИ ПРИЛОЖЕНИЯ ---
+http_requests = Counter("astro_http_requests_total", "HTTP requests", ("method", "route", "status"))
+http_latency = Histogram("astro_http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+spans = Histogram("astro_span_duration_seconds", "Hot path phases: db, chart_wait, chart_run, openai, commit", ("span",))
+cache_requests = Counter("astro_cache_requests_total", "Cache lookups by cache and result", ("cache", "result"))
+llm_calls = Counter("astro_llm_calls_total", "LLM calls by kind and outcome (ok, failed, rate_limited, error, rejected)", ("kind", "outcome"))
+llm_retries = Counter("astro_llm_retries_total", "LLM retry attempts", ("kind",))
+llm_hedges = Counter("astro_llm_hedges_total", "Hedged LLM requests", ("kind",))
+rate_limited = Counter("astro_rate_limited_total", "Requests rejected by admission control (user, ip, busy)", ("reason",))
+bot_updates = Counter("astro_bot_updates_total", "Telegram updates handled", ("event", "status"))
+bot_latency = Histogram("astro_bot_update_duration_seconds", "Telegram update handling latency", ("event",))
+
+
+def span(name: str):
+    """with span("db"): ... — время фазы в гистограмму astro_span_duration_seconds."""
+    return spans.time(span=name)
+
+
+def cache_hit(cache: str, hit: bool) -> None:
+    cache_requests.inc(cache=cache, result="hit" if hit else "miss")
+
+
+# --- HTTP MIDDLEWARE ---
+class MetricsMiddleware:
+    """Чистый ASGI: не буферизует ответы, поэтому SSE-стримы меряются до последнего байта."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Шаблон роута вместо пути, иначе user_id раздует число рядов
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            http_latency.observe(time.perf_counter() - started, method=method, route=route)
+            http_requests.inc(method=method, route=route, status=status)
+
+
+# --- СЭМПЛИРУЮЩИЙ ПРОФАЙЛЕР ---
+class SamplingProfiler:
+    """
+    Раз в interval снимает стек главного потока (event loop) и копит стеки
+    в collapsed-формате: вывод скармливается flamegraph.pl / speedscope.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def sample(self, seconds: float, interval: float = 0.005) -> str:
+        # Одновременно только один сеанс, чтобы не удваивать накладные расходы
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("profiler is already running")
+        try:
+            target = threading.main_thread().ident
+            stacks: _Tally[str] = _Tally()
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                frame = sys._current_frames().get(target)
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if names:
+                    stacks[";".join(reversed(names))] += 1
+                time.sleep(interval)
+            return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()) + "\n"
+        finally:
+            self._lock.release()
+
+
+profiler = SamplingProfiler()
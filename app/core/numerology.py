@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+from datetime import date
+from typing import TYPE_CHECKING
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.core.generation import generation
+from app.core.llm import generate_numerology
+from app.models import NumerologyInterpretation
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+# Все возможные числа пути - ответ модели зависит только от них
+LIFE_PATH_NUMBERS = [1, 2, 3, 4, 5, 6, 7, 8, 9, 11, 22, 33]
+
+
+def calculate_life_path_number(birth_date: date) -> int:
+    digits = f"{birth_date.year}{birth_date.month:02d}{birth_date.day:02d}"
+    total = sum(int(d) for d in digits)
+    while total > 9 and total not in [11, 22, 33]:
+        total = sum(int(d) for d in str(total))
+    return total
+
+
+class NumerologyStore:
+    """
+    Общие для всех пользователей трактовки числа пути.
+    На каждое число держим небольшой пул вариантов и раздаем их по кругу,
+    так что почти каждый запрос - это поиск в памяти без похода в OpenAI.
+    """
+
+    def __init__(self, variants: int):
+        self.variants = variants
+        self._pool: dict[int, list[str]] = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._add_locks: dict[int, asyncio.Lock] = {}
+        self._rotation = itertools.count()
+        self._background: set[asyncio.Task] = set()
+
+    async def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            async with async_session_factory() as db:
+                result = await db.execute(
+                    select(NumerologyInterpretation).order_by(NumerologyInterpretation.id)
+                )
+                for row in result.scalars():
+                    self._pool.setdefault(row.number, []).append(row.text)
+            self._loaded = True
+
+    async def add(self, number: int, text: str) -> bool:
+        """Сохранить вариант, если пул числа еще не полон. Единственная точка записи в пул:
+        и генерация по слоту, и допись из SSE-стрима. Возвращает, добавлен ли текст."""
+        await self._ensure_loaded()
+        # Проверка и запись под одним замком: параллельные стримы не переполнят пул
+        async with self._add_locks.setdefault(number, asyncio.Lock()):
+            if not self.missing(number) or text in self._pool.get(number, []):
+                return False
+            async with async_session_factory() as db:
+                db.add(NumerologyInterpretation(number=number, text=text))
+                await db.commit()
+            self._pool.setdefault(number, []).append(text)
+        return True
+
+    async def _generate(self, client: AsyncOpenAI, number: int) -> str:
+        text = await generate_numerology(client, number)
+        await self.add(number, text)
+        return text
+
+    def missing(self, number: int) -> int:
+        return max(self.variants - len(self._pool.get(number, [])), 0)
+
+    async def fill(self, client: AsyncOpenAI, number: int) -> str:
+        # Ключ по номеру слота: параллельные запросы не плодят лишние варианты
+        slot = len(self._pool.get(number, []))
+        return await generation.run(("numerology", number, slot), lambda: self._generate(client, number))
+
+    def _fill_in_background(self, client: AsyncOpenAI, number: int) -> None:
+        task = asyncio.create_task(self.fill(client, number))
+        self._background.add(task)
+        task.add_done_callback(self._on_background_done)
+
+    def _on_background_done(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.warning(f"Numerology fill error: {task.exception()}")
+
+    async def peek(self, client: AsyncOpenAI, number: int) -> str | None:
+        """Готовый вариант без ожидания генерации (None, если пул пуст)."""
+        await self._ensure_loaded()
+        pool = self._pool.get(number)
+        if not pool:
+            return None
+
+        if self.missing(number):
+            # Отдаем готовый вариант сразу, а пул дозаполняем фоном
+            self._fill_in_background(client, number)
+
+        return pool[next(self._rotation) % len(pool)]
+
+    async def get(self, client: AsyncOpenAI, number: int) -> str:
+        text = await self.peek(client, number)
+        if text is None:
+            # Пул пуст (не было прогрева) - первый запрос ждет генерацию
+            text = await self.fill(client, number)
+        return text
+
+    async def warm_up(self, client: AsyncOpenAI) -> int:
+        await self._ensure_loaded()
+        generated = 0
+        for number in LIFE_PATH_NUMBERS:
+            for _ in range(self.missing(number)):
+                await self.fill(client, number)
+                generated += 1
+        return generated
+
+
+numerology_store = NumerologyStore(variants=settings.NUMEROLOGY_VARIANTS)
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import random
+import time as time_module
+from datetime import date, datetime, timedelta
+
+from openai import AsyncOpenAI, RateLimitError
+from sqlalchemy import Row, select, update
+
+from app.core.astro_engine import astro_engine
+from app.core.clients import get_openai, close_clients
+from app.core.config import settings
+from app.core.database import engine, async_session_factory, dialect_insert
+from app.core.llm import advice_prompt, generate_daily_advice, generate_affirmation
+from app.core.llm_guard import LLMUnavailable, llm_guard
+from app.core.prompt_cache import prompt_cache
+from app.core.transits import get_transits, sky_context
+from app.core.user_cache import invalidate_user
+from app.models import User, UserGeneration, AnalyticsEvent
+
+# Ночная предгенерация совета дня и аффирмации.
+# Запуск отдельно от API (например, cron в 04:00): python -m app.core.pregenerate
+# Утром эндпоинты просто читают готовые колонки из БД.
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 4
+
+
+class RateGate:
+    """Общая пауза для всех воркеров, когда OpenAI отвечает 429."""
+
+    def __init__(self):
+        self._resume_at = 0.0
+
+    async def wait(self) -> None:
+        delay = self._resume_at - time_module.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        self._resume_at = max(self._resume_at, time_module.monotonic() + seconds)
+
+
+def _retry_after(error: RateLimitError, attempt: int) -> float:
+    header = error.response.headers.get("retry-after") if error.response is not None else None
+    try:
+        return float(header)
+    except (TypeError, ValueError):
+        # Экспоненциальная пауза с джиттером
+        return 2 ** attempt + random.random()
+
+
+# Для аспектов транзитов к натальной карте (см. chart_cache.birth_data)
+BIRTH_COLUMNS = (User.birth_date, User.birth_time, User.birth_place, User.birth_lat, User.birth_lon, User.birth_tz)
+
+
+async def select_active_users(today: date) -> list[tuple[Row, bool, bool]]:
+    """
+    Активные = сами заходили в мини-апп (события api_* в analytics_events) за последние N дней.
+    Даты в user_generations для этого не годятся: их пишет и сама предгенерация, и
+    однажды попавший в выборку пользователь оставался бы в ней навсегда.
+    """
+    since = today - timedelta(days=settings.PREGEN_ACTIVE_DAYS)
+    recent_requests = select(AnalyticsEvent.user_id).where(
+        AnalyticsEvent.created_at >= datetime.combine(since, datetime.min.time()),
+        AnalyticsEvent.event_type.startswith("api_", autoescape=True),
+    )
+    stmt = (
+        select(User.id, *BIRTH_COLUMNS, UserGeneration.last_advice_date, UserGeneration.last_affirmation_date)
+        .outerjoin(UserGeneration, UserGeneration.user_id == User.id)
+        .where(User.id.in_(recent_requests))
+    )
+    async with async_session_factory() as db:
+        rows = (await db.execute(stmt)).all()
+
+    # Возвращаем (пользователь с данными рождения, нужен совет, нужна аффирмация)
+    return [
+        (row, row.last_advice_date != today, row.last_affirmation_date != today)
+        for row in rows
+        if row.last_advice_date != today or row.last_affirmation_date != today
+    ]
+
+
+async def _generate(gate: RateGate, factory) -> str | None:
+    for attempt in range(MAX_ATTEMPTS):
+        await gate.wait()
+        # Breaker открыт - ждем конца cooldown, не тратя попытку: иначе за cooldown
+        # пользователи пакета исчерпали бы MAX_ATTEMPTS отказами "circuit open"
+        while (cooldown := llm_guard.breaker.retry_in()) > 0:
+            gate.pause(cooldown + random.random())
+            await gate.wait()
+        try:
+            return await factory()
+        except RateLimitError as e:
+            gate.pause(_retry_after(e, attempt))
+        except LLMUnavailable as e:
+            # Breaker открыт или OpenAI не отвечает - ждем все вместе, как при 429
+            logger.warning(f"Pregeneration paused: {e}")
+            gate.pause(2 ** attempt + random.random())
+        except Exception as e:
+            logger.warning(f"Pregeneration error: {e}")
+            return None
+    return None
+
+
+async def _flush(rows: list[dict]) -> None:
+    if not rows:
+        return
+    # Upsert пачкой: строк user_generations у части пользователей еще нет.
+    # Группируем по набору колонок - у каждой группы один многострочный INSERT
+    groups: dict[tuple, list[dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+
+    async with async_session_factory() as db:
+        for columns, group in groups.items():
+            stmt = dialect_insert(UserGeneration).values(
+                [{"user_id": row["id"], **{k: v for k, v in row.items() if k != "id"}} for row in group]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[UserGeneration.user_id],
+                set_={k: stmt.excluded[k] for k in columns if k != "id"},
+            )
+            await db.execute(stmt)
+        # Новая версия строки - у клиентов устареет ETag профиля
+        ids = [row["id"] for row in rows]
+        await db.execute(update(User).where(User.id.in_(ids)).values(version=User.version + 1))
+        await db.commit()
+    # Для общего Redis-кэша профилей; локальный LRU API-процессов доживет до TTL
+    for row in rows:
+        await invalidate_user(row["id"])
+
+
+async def pregenerate(client: AsyncOpenAI, today: date) -> int:
+    users = await select_active_users(today)
+    logger.info(f"Pregeneration for {len(users)} users")
+
+    try:
+        # Эфемериды на сегодня - один раз до старта, а не в каждой задаче
+        await get_transits()
+    except Exception as e:
+        logger.warning(f"Transit snapshot error: {e!r}")
+
+    gate = RateGate()
+    semaphore = asyncio.Semaphore(settings.PREGEN_CONCURRENCY)
+    pending: list[dict] = []
+    done = 0
+
+    async def process(user: Row, need_advice: bool, need_affirmation: bool) -> None:
+        nonlocal pending, done
+        async with semaphore:
+            row = {"id": user.id}
+            if need_advice:
+                # Снимок неба общий и уже посчитан, на пользователя - только аспекты к его карте
+                sky = await sky_context(user)
+                text = await _generate(gate, lambda: prompt_cache.run(
+                    "advice", advice_prompt("advice", sky),
+                    lambda: generate_daily_advice(client, "advice", sky), day=today
+                ))
+                if text:
+                    row.update(daily_advice=text, last_advice_date=today)
+            if need_affirmation:
+                text = await _generate(gate, lambda: generate_affirmation(client))
+                if text:
+                    row.update(daily_affirmation=text, last_affirmation_date=today)
+
+        if len(row) > 1:
+            pending.append(row)
+            done += 1
+        if len(pending) >= settings.PREGEN_BATCH_SIZE:
+            batch, pending = pending, []
+            await _flush(batch)
+
+    await asyncio.gather(*(process(*user) for user in users))
+    await _flush(pending)
+    return done
+
+
+async def main():
+    client = get_openai()
+    print("🌅 Готовлю утренние прогнозы...")
+    done = await pregenerate(client, date.today())
+    print(f"✅ Готово. Пользователей обновлено: {done}")
+
+    await close_clients()
+    astro_engine.shutdown()
+    await engine.dispose()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+import hashlib
+import itertools
+import re
+import unicodedata
+from datetime import date
+from typing import Awaitable, Callable
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.generation import generation
+from app.core.metrics import cache_hit
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize(prompt: str) -> str:
+    """Регистр, ё/е, пунктуация и пробелы на смысл промпта не влияют."""
+    text = unicodedata.normalize("NFKC", prompt).lower().replace("ё", "е")
+    return " ".join(_PUNCTUATION.sub(" ", text).split())
+
+
+class PromptCache:
+    """
+    Общие для всех пользователей ответы на одинаковые промпты.
+    Ключ: (вид, дата, хэш нормализованного промпта). На ключ копится до K вариантов
+    (temperature высокая - они разные), дальше варианты раздаются по кругу без OpenAI.
+    Работает под персональными колонками: те хранят уже выданный текст, а здесь
+    он переиспользуется для всех, у кого тот же знак неба и те же аспекты.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, variants: int):
+        self.variants = variants
+        self._pools = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._rotation = itertools.count()
+
+    @staticmethod
+    def key(kind: str, prompt: str, day: date) -> tuple[str, str, str]:
+        digest = hashlib.blake2b(normalize(prompt).encode(), digest_size=16).hexdigest()
+        return kind, day.isoformat(), digest
+
+    async def run(self, kind: str, prompt: str, factory: Callable[[], Awaitable[str]],
+                  day: date | None = None) -> str:
+        if self.variants <= 0:
+            return await factory()
+
+        key = self.key(kind, prompt, day or date.today())
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = []
+            self._pools.set(key, pool)
+
+        if len(pool) >= self.variants:
+            cache_hit("prompt", True)
+            return pool[next(self._rotation) % len(pool)]
+
+        cache_hit("prompt", False)
+        # Ключ по номеру слота: параллельные промахи ждут одну генерацию, а не плодят лишние
+        text = await generation.run((*key, len(pool)), factory)
+        if text not in pool and len(pool) < self.variants:
+            pool.append(text)
+        return text
+
+
+prompt_cache = PromptCache(
+    maxsize=settings.PROMPT_CACHE_SIZE,
+    ttl=settings.PROMPT_CACHE_TTL,
+    variants=settings.PROMPT_CACHE_VARIANTS,
+)
@@ -0,0 +1,149 @@
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, TypeVar
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel
+
+from app.core.auth import authorized
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import rate_limited
+
+logger = logging.getLogger(__name__)
+
+M = TypeVar("M", bound=BaseModel)
+
+
+# --- БЭКЕНДЫ ---
+class MemoryBackend:
+    """Корзины в памяти процесса (по умолчанию): при нескольких воркерах лимит умножается на их число."""
+
+    def __init__(self, maxsize: int):
+        # Вытесненная из LRU корзина просто начнется заново полной
+        self._buckets = TTLCache(maxsize=maxsize)
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """Забрать токен. 0 - можно, иначе сколько секунд ждать до следующего."""
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated_at) * rate)
+        if tokens >= 1:
+            self._buckets.set(key, (tokens - 1, now))
+            return 0.0
+        self._buckets.set(key, (tokens, now))
+        return (1 - tokens) / rate
+
+
+# Пополнение и списание за один атомарный вызов, чтобы воркеры не гонялись за корзину
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(now - ts, 0) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBackend:
+    """Общие корзины для всех воркеров (локальный Redis или совместимый сервер)."""
+
+    def __init__(self, url: str):
+        from redis import asyncio as aioredis  # Опциональная зависимость
+
+        self._redis = aioredis.from_url(url)
+        self._take = self._redis.register_script(_TAKE_SCRIPT)
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        wait = await self._take(keys=[f"astro:rate:{key}"], args=[rate, burst, time.time()])
+        return float(wait)
+
+
+def _create_backend():
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisBackend(settings.REDIS_URL)
+    return MemoryBackend(maxsize=100_000)
+
+
+# --- ДОПУСК ---
+def too_many_requests(retry_after: float) -> HTTPException:
+    return HTTPException(status_code=429, detail="Слишком много запросов, попробуйте чуть позже",
+                         headers={"Retry-After": str(max(1, math.ceil(retry_after)))})
+
+
+class RateLimiter:
+    """
+    Допуск к эндпоинтам, которые ходят в OpenAI:
+    - token bucket на user_id и на IP (частые повторы одного клиента);
+    - общий бюджет одновременных дорогих запросов процесса (наплыв всех сразу).
+    Отказ - 429 с Retry-After, до OpenAI и БД запрос не доходит.
+    """
+
+    def __init__(self, backend, concurrency: int):
+        self.backend = backend
+        self.concurrency = concurrency
+        self._in_flight = 0
+
+    async def _take(self, key: str, rate: float, burst: int) -> float:
+        try:
+            return await self.backend.take(key, rate, burst)
+        except Exception as e:
+            # Redis недоступен - лучше пропустить запрос, чем положить API
+            logger.warning(f"Rate limiter backend error: {e}")
+            return 0.0
+
+    async def check(self, user_id: int | None, ip: str | None) -> None:
+        if user_id is not None:
+            wait = await self._take(f"user:{user_id}", settings.RATE_LIMIT_USER_RATE, settings.RATE_LIMIT_USER_BURST)
+            if wait:
+                rate_limited.inc(reason="user")
+                raise too_many_requests(wait)
+        if ip:
+            wait = await self._take(f"ip:{ip}", settings.RATE_LIMIT_IP_RATE, settings.RATE_LIMIT_IP_BURST)
+            if wait:
+                rate_limited.inc(reason="ip")
+                raise too_many_requests(wait)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if self._in_flight >= self.concurrency:
+            rate_limited.inc(reason="busy")
+            raise too_many_requests(1)
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+
+
+limiter = RateLimiter(_create_backend(), concurrency=settings.RATE_LIMIT_CONCURRENCY)
+
+
+def admitted(model: type[M], anonymous: bool = False) -> Callable[[Request], AsyncIterator[M]]:
+    """
+    Depends(admitted(Model)) для дорогих эндпоинтов: тело как в authorized, затем
+    лимиты по user_id из сессии и IP клиента. Слот бюджета держится до конца ответа,
+    включая SSE-стрим.
+    """
+    parse = authorized(model, anonymous)
+
+    async def dependency(request: Request) -> AsyncIterator[M]:
+        body = await parse(request)
+        await limiter.check(getattr(body, "user_id", None), request.client.host if request.client else None)
+        async with limiter.slot():
+            yield body
+
+    return dependency
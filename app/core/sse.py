@@ -0,0 +1,87 @@
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Awaitable, Callable
+
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+# Если тело ответа так и не начали читать (клиент ушел до старта), finally стрима не
+# выполнится - ключ генерации освобождаем по таймеру, чтобы повторные запросы не ждали вечно
+CLAIM_TIMEOUT = 120.0
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # nginx не должен буферизовать поток
+}
+
+
+def sse_event(data: dict, event: str | None = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def sse_reply(text: str) -> StreamingResponse:
+    """Готовый ответ (из кэша) одним событием done."""
+    async def events():
+        yield sse_event({"reply": text}, event="done")
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+def sse_stream(
+    tokens: AsyncIterator[str],
+    on_complete: Callable[[str], Awaitable[None]],
+    fallback: str,
+    prefix: str = "",
+    result: asyncio.Future | None = None,
+) -> StreamingResponse:
+    """
+    Пересылает токены модели клиенту по мере генерации (событие по умолчанию - delta),
+    а в конце отдает полный текст событием done и сохраняет его через on_complete.
+    result (generation.claim) получает итоговый текст или None, если стрим не удался
+    или клиент ушел: так параллельные запросы с тем же ключом не висят.
+    """
+    if result is not None:
+        release = asyncio.get_running_loop().call_later(
+            CLAIM_TIMEOUT, lambda: result.done() or result.set_result(None)
+        )
+        result.add_done_callback(lambda _: release.cancel())
+
+    async def events():
+        parts = [prefix] if prefix else []
+        full_text = None
+        try:
+            if prefix:
+                yield sse_event({"delta": prefix})
+            received = False
+            try:
+                async for token in tokens:
+                    parts.append(token)
+                    received = received or bool(token.strip())
+                    yield sse_event({"delta": token})
+            except Exception as e:
+                logger.error(f"OpenAI stream error: {e}")
+                yield sse_event({"reply": fallback}, event="error")
+                return
+
+            if not received:
+                # Пустой ответ (один префикс) не сохраняем: он попал бы в профиль и в общие пулы
+                logger.error("OpenAI stream ended without tokens")
+                yield sse_event({"reply": fallback}, event="error")
+                return
+
+            full_text = "".join(parts)
+            if result is not None and not result.done():
+                result.set_result(full_text)
+            try:
+                await on_complete(full_text)
+            except Exception as e:
+                logger.error(f"Stream persist error: {e}")
+            yield sse_event({"reply": full_text}, event="done")
+        finally:
+            if result is not None and not result.done():
+                result.set_result(full_text)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from datetime import date, datetime, time, timezone
+
+from app.core.astro import PLANETS, ZODIAC_NAMES
+from app.core.chart_cache import get_chart, get_planets
+
+logger = logging.getLogger(__name__)
+
+# Небо одно на всех: медленные планеты считаем раз в сутки (на полдень UTC),
+# Луну (~13° в сутки) - раз в час. Снимок - обычная карта на (дата, время, UTC, 0°, 0°):
+# геоцентрические долготы от места не зависят. Хранится он там же, где натальные
+# карты: память процесса + таблица chart_cache. Межпроцессной блокировки нет:
+# внутри процесса расчет один (см. _pending), а воркеры, промахнувшиеся одновременно
+# на смене дня или часа, считают снимок каждый сам (по одному расчету на воркер).
+# Кто спросил после записи строки - берет снимок из БД
+SKY_COORDS = (0.0, 0.0)
+HOURLY = {"Moon"}
+
+# Аспекты транзитной планеты к натальной: (угол, название, орб)
+ASPECTS = (
+    (0, "соединение", 6.0),
+    (60, "секстиль", 3.0),
+    (90, "квадрат", 5.0),
+    (120, "трин", 5.0),
+    (180, "оппозиция", 6.0),
+)
+
+PLANET_NAMES = {planet_id: name for planet_id, name, _ in PLANETS}
+
+# Расчеты в полете: после смены дня или часа считает первый запрос, остальные его ждут
+_pending: dict[tuple[date, time], asyncio.Future] = {}
+
+
+async def _sky_at(day: date, at: time) -> list[dict]:
+    key = (day, at)
+    future = _pending.get(key)
+    if future is None:
+        future = asyncio.ensure_future(
+            get_chart(day.strftime("%Y/%m/%d"), at.strftime("%H:%M"), "+00:00", *SKY_COORDS)
+        )
+        _pending[key] = future
+        future.add_done_callback(lambda _: _pending.pop(key, None))
+    # Отмена одного запроса не должна отменять общий расчет
+    return await asyncio.shield(future)
+
+
+async def get_transits(now: datetime | None = None) -> list[dict]:
+    """Положения планет сейчас: снимок дня, Луна - из снимка текущего часа."""
+    now = now or datetime.now(timezone.utc)
+    daily, hourly = await asyncio.gather(
+        _sky_at(now.date(), time(12, 0)),
+        _sky_at(now.date(), time(now.hour, 30)),
+    )
+    fast = {planet["id"]: planet for planet in hourly if planet["id"] in HOURLY}
+    return [fast.get(planet["id"], planet) for planet in daily]
+
+
+def transit_aspects(transits: list[dict], natal: list[dict], limit: int = 3) -> list[tuple[str, str, str, float]]:
+    """Самые точные аспекты транзитов к натальной карте: (транзит, аспект, натал, орб)."""
+    found = []
+    for transit in transits:
+        for planet in natal:
+            distance = abs((transit["lon"] - planet["lon"] + 180) % 360 - 180)
+            for angle, name, orb in ASPECTS:
+                delta = abs(distance - angle)
+                if delta <= orb:
+                    found.append((transit["id"], name, planet["id"], round(delta, 1)))
+    found.sort(key=lambda aspect: aspect[3])
+    return found[:limit]
+
+
+def describe(transits: list[dict], aspects: list[tuple[str, str, str, float]]) -> str:
+    # Орбы в текст не идут: у людей с похожими картами промпт совпадет целиком,
+    # и совет возьмется из общего prompt_cache
+    sky = ", ".join(
+        f"{PLANET_NAMES[p['id']]} в знаке {ZODIAC_NAMES.get(p['sign'], p['sign'])}" for p in transits
+    )
+    text = f"Небо сегодня: {sky}."
+    if aspects:
+        text += " Транзиты к натальной карте: " + "; ".join(
+            f"{PLANET_NAMES[t]} → натальное {PLANET_NAMES[n]}: {name}"
+            for t, name, n, _ in aspects
+        ) + "."
+    return text
+
+
+async def sky_context(user) -> str:
+    """Транзиты (и аспекты к карте, если есть дата рождения) для промпта совета дня.
+    Пустая строка, если небо сейчас не посчитать - совет тогда пишется без него."""
+    try:
+        transits = await get_transits()
+    except Exception as e:
+        logger.warning(f"Transit snapshot error: {e!r}")
+        return ""
+
+    aspects = []
+    if user is not None and user.birth_date:
+        try:
+            # Натальная карта почти всегда уже в кэше карт
+            aspects = transit_aspects(transits, await get_planets(user))
+        except Exception as e:
+            logger.warning(f"Natal chart for transits error: {e!r}")
+    return describe(transits, aspects)
@@ -0,0 +1,187 @@
+import logging
+from datetime import date, time
+
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import select, update
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import async_session_factory, dialect_insert
+from app.core.metrics import cache_hit, span
+from app.models import User, UserGeneration
+
+logger = logging.getLogger(__name__)
+
+
+class UserProfile(BaseModel):
+    """Снимок строки users и ее user_generations, который живет в кэше (ORM-объекты между сессиями не шарим)."""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    username: str | None = None
+    full_name: str | None = None
+    referrer_id: int | None = None
+
+    birth_date: date | None = None
+    birth_time: time | None = None
+    birth_place: str | None = None
+    birth_lat: float | None = None
+    birth_lon: float | None = None
+    birth_tz: str | None = None
+    theme: str | None = None
+
+    natal_analysis: str | None = None
+    numerology_analysis: str | None = None
+    daily_advice: str | None = None
+    last_advice_date: date | None = None
+    daily_affirmation: str | None = None
+    last_affirmation_date: date | None = None
+    version: int = 1
+
+
+GENERATION_FIELDS = (
+    "natal_analysis", "numerology_analysis",
+    "daily_advice", "last_advice_date",
+    "daily_affirmation", "last_affirmation_date",
+)
+
+
+def _snapshot(user: User, generation: UserGeneration | None) -> UserProfile:
+    profile = UserProfile.model_validate(user)
+    if generation is not None:
+        for field in GENERATION_FIELDS:
+            setattr(profile, field, getattr(generation, field))
+    return profile
+
+
+# --- БЭКЕНДЫ ---
+class MemoryBackend:
+    """LRU в памяти процесса (по умолчанию)."""
+
+    def __init__(self, maxsize: int, ttl: int):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, user_id: int) -> UserProfile | None:
+        return self._cache.get(user_id)
+
+    async def set(self, profile: UserProfile) -> None:
+        self._cache.set(profile.id, profile)
+
+    async def delete(self, user_id: int) -> None:
+        self._cache.pop(user_id)
+
+
+class RedisBackend:
+    """Общий кэш для нескольких воркеров (локальный Redis или совместимый сервер)."""
+
+    def __init__(self, url: str, ttl: int):
+        from redis import asyncio as aioredis  # Опциональная зависимость
+
+        self._redis = aioredis.from_url(url)
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"astro:user:{user_id}"
+
+    async def get(self, user_id: int) -> UserProfile | None:
+        raw = await self._redis.get(self._key(user_id))
+        return UserProfile.model_validate_json(raw) if raw else None
+
+    async def set(self, profile: UserProfile) -> None:
+        await self._redis.set(self._key(profile.id), profile.model_dump_json(), ex=self.ttl)
+
+    async def delete(self, user_id: int) -> None:
+        await self._redis.delete(self._key(user_id))
+
+
+def _create_backend():
+    if settings.USER_CACHE_BACKEND == "redis":
+        return RedisBackend(settings.REDIS_URL, ttl=settings.USER_CACHE_TTL)
+    return MemoryBackend(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
+
+
+backend = _create_backend()
+
+
+# --- ДОСТУП К ПРОФИЛЮ ---
+async def get_user(user_id: int) -> UserProfile | None:
+    """Единая точка чтения пользователя: кэш, а при промахе - короткий запрос в БД."""
+    try:
+        profile = await backend.get(user_id)
+        cache_hit("user", profile is not None)
+        if profile is not None:
+            return profile
+    except Exception as e:
+        # Кэш недоступен - просто идем в БД
+        logger.warning(f"User cache read error: {e}")
+
+    with span("db"):
+        async with async_session_factory() as db:
+            row = (await db.execute(
+                select(User, UserGeneration)
+                .outerjoin(UserGeneration, UserGeneration.user_id == User.id)
+                .where(User.id == user_id)
+            )).first()
+    if row is None:
+        return None
+    profile = _snapshot(*row)
+
+    try:
+        await backend.set(profile)
+    except Exception as e:
+        logger.warning(f"User cache write error: {e}")
+    return profile
+
+
+async def get_account(user_id: int):
+    """
+    Узкое чтение строки users (id, username, referrer_id) для бота и проверки реферера:
+    без join с user_generations и без записи в кэш профилей. Полный снимок с текстами
+    (get_user) нужен только API профиля и генераций.
+    """
+    with span("db"):
+        async with async_session_factory() as db:
+            return (await db.execute(
+                select(User.id, User.username, User.referrer_id).where(User.id == user_id)
+            )).first()
+
+
+async def invalidate_user(user_id: int) -> None:
+    try:
+        await backend.delete(user_id)
+    except Exception as e:
+        logger.warning(f"User cache delete error: {e}")
+
+
+async def save_generation(user_id: int, *where, **values) -> bool:
+    """
+    Короткая запись текстов генерации в user_generations в собственной сессии:
+    соединение берется только на сами запросы, а не на время генерации. Условия
+    where (по UserGeneration или User) защищают от гонок - например, профиль
+    поменяли, пока OpenAI думал. Возвращает, записался ли текст.
+    """
+    async with async_session_factory() as db:
+        # Строка генераций появляется при первой записи
+        await db.execute(dialect_insert(UserGeneration).values(user_id=user_id).on_conflict_do_nothing())
+        result = await db.execute(
+            update(UserGeneration)
+            .where(UserGeneration.user_id == user_id, User.id == UserGeneration.user_id, *where)
+            .values(**values)
+        )
+        if result.rowcount:
+            # Профиль в ответе API поменялся - новая версия для ETag
+            await db.execute(update(User).where(User.id == user_id).values(version=User.version + 1))
+        with span("commit"):
+            await db.commit()
+    await invalidate_user(user_id)
+    return result.rowcount > 0
+
+
+def birth_unchanged(profile: UserProfile) -> tuple:
+    """Условия UPDATE: данные рождения те же, что в снимке, по которому шла генерация."""
+    return (
+        User.birth_date.is_not_distinct_from(profile.birth_date),
+        User.birth_time.is_not_distinct_from(profile.birth_time),
+        User.birth_place.is_not_distinct_from(profile.birth_place),
+    )
@@ -0,0 +1,18 @@
+import asyncio
+
+from app.core.clients import get_openai, close_clients
+from app.core.database import engine
+from app.core.numerology import numerology_store
+
+
+async def main():
+    client = get_openai()
+    print("🔢 Прогреваю трактовки чисел пути...")
+    generated = await numerology_store.warm_up(client)
+    print(f"✅ Готово. Новых вариантов: {generated}")
+
+    await close_clients()
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
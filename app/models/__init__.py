@@ -1,3 +1,7 @@
-from .user import User
-from .analytics import AnalyticsEvent
-from .transaction import Transaction
\ No newline at end of file
+from .user import User
+from .analytics import AnalyticsEvent
+from .transaction import Transaction
+from .chart import ChartCacheEntry
+from .generation import UserGeneration
+
+from .numerology import NumerologyInterpretation
\ No newline at end of file
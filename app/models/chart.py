@@ -0,0 +1,16 @@
+from sqlalchemy import String, Text, func, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+from datetime import datetime
+
+
+class ChartCacheEntry(Base):
+    __tablename__ = "chart_cache"
+
+    # Ключ: "дата|время|смещение UTC|широта|долгота"
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+
+    # Позиции планет в JSON: [{"id": "Sun", "sign": "Aries", "lon": 12.3}, ...]
+    planets: Mapped[str] = mapped_column(Text)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
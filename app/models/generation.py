@@ -0,0 +1,23 @@
+from sqlalchemy import BigInteger, Date, DateTime, ForeignKey, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+from datetime import datetime, date
+
+
+class UserGeneration(Base):
+    __tablename__ = "user_generations"
+
+    # Одна строка на пользователя, создается при первой генерации
+    user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+
+    # --- КЭШ ПРОГНОЗОВ ---
+    natal_analysis: Mapped[str | None] = mapped_column(Text, nullable=True)
+    numerology_analysis: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    daily_advice: Mapped[str | None] = mapped_column(Text, nullable=True)
+    last_advice_date: Mapped[date | None] = mapped_column(Date, nullable=True, index=True)
+
+    daily_affirmation: Mapped[str | None] = mapped_column(Text, nullable=True)
+    last_affirmation_date: Mapped[date | None] = mapped_column(Date, nullable=True, index=True)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
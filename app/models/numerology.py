@@ -0,0 +1,18 @@
+from sqlalchemy import Integer, Text, func, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+from datetime import datetime
+
+
+class NumerologyInterpretation(Base):
+    __tablename__ = "numerology_interpretations"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+
+    # Число жизненного пути: 1-9, 11, 22, 33
+    number: Mapped[int] = mapped_column(Integer, index=True)
+
+    # Готовый ответ в формате "YOUR_NUMBER:N\n\n..."
+    text: Mapped[str] = mapped_column(Text)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
@@ -0,0 +1,64 @@
+import argparse
+import json
+import random
+import time
+from datetime import date, timedelta
+
+from app.core.astro import compute_planets
+from app.core.astro_batch import compute_charts
+
+# Сравнение пакетного API с поштучным расчетом flatlib Chart (как в старом calculate_chart).
+# Запуск из корня репозитория: python -m benchmarks.bench_astro_batch --charts 2000
+
+
+def random_rows(count: int, seed: int) -> list[tuple[str, str, str, float, float]]:
+    rnd = random.Random(seed)
+    start = date(1950, 1, 1)
+    rows = []
+    for _ in range(count):
+        day = start + timedelta(days=rnd.randrange(365 * 60))
+        offset = rnd.choice(["+00:00", "+02:00", "+03:00", "+05:00", "+07:00", "-05:00"])
+        rows.append((
+            day.strftime("%Y/%m/%d"),
+            f"{rnd.randrange(24):02d}:{rnd.randrange(60):02d}",
+            offset,
+            round(rnd.uniform(-60, 66), 4),
+            round(rnd.uniform(-180, 180), 4),
+        ))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--charts", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rows = random_rows(args.charts, args.seed)
+
+    started = time.perf_counter()
+    singles = [compute_planets(d, t, lat, lon, offset) for d, t, offset, lat, lon in rows]
+    single_sec = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batch = compute_charts(rows)
+    batch_sec = time.perf_counter() - started
+
+    # Пакетный путь обязан давать те же знаки, что и flatlib Chart
+    mismatches = sum(
+        a["sign"] != b["sign"]
+        for i, single in enumerate(singles)
+        for a, b in zip(single, batch.planets(i))
+    )
+
+    print(json.dumps({
+        "charts": args.charts,
+        "single_us_per_chart": round(single_sec / args.charts * 1e6, 1),
+        "batch_us_per_chart": round(batch_sec / args.charts * 1e6, 1),
+        "speedup": round(single_sec / batch_sec, 2) if batch_sec else None,
+        "sign_mismatches": mismatches,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
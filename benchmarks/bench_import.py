@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Время холодного импорта модулей приложения по данным python -X importtime.
+# Каждый замер - отдельный процесс, первый (прогрев .pyc) в статистику не идет.
+# Запуск из корня репозитория:
+#   python -m benchmarks.bench_import
+#   python -m benchmarks.bench_import --modules app.core.main --runs 10 --budget-ms 1200
+# Код выхода 1, если медиана превысила бюджет или импорт потянул тяжелый SDK
+# (aiogram, openai, flatlib...), который должен грузиться только при первом использовании.
+
+MODULES = ("app.core.main", "app.core.init_db", "app.models")
+FORBIDDEN = ("aiogram", "openai", "flatlib", "swisseph", "uvicorn")
+
+
+def import_times(module: str) -> dict[str, tuple[int, int]]:
+    """{модуль: (собственное время, накопленное время)} в микросекундах."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=os.environ.copy(),
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def measure(module: str, runs: int, top: int) -> dict:
+    import_times(module)  # Прогрев: компиляция .pyc и кэш файловой системы
+
+    totals = []
+    packages: dict[str, list[int]] = {}
+    loaded: set[str] = set()
+    for _ in range(runs):
+        times = import_times(module)
+        totals.append(times[module][1] / 1000)
+        loaded.update(times)
+
+        # Сколько стоит каждый сторонний пакет целиком (сумма собственного времени его модулей)
+        per_package: dict[str, int] = {}
+        for name, (self_us, _) in times.items():
+            package = name.split(".")[0]
+            if package != "app":
+                per_package[package] = per_package.get(package, 0) + self_us
+        for package, us in per_package.items():
+            packages.setdefault(package, []).append(us)
+
+    heaviest = sorted(packages.items(), key=lambda item: statistics.median(item[1]), reverse=True)[:top]
+    return {
+        "module": module,
+        "runs": runs,
+        "median_ms": round(statistics.median(totals), 1),
+        "min_ms": round(min(totals), 1),
+        "max_ms": round(max(totals), 1),
+        "heaviest_packages_ms": {name: round(statistics.median(us) / 1000, 1) for name, us in heaviest},
+        "forbidden_loaded": sorted({name.split(".")[0] for name in loaded} & set(FORBIDDEN)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modules", nargs="+", default=list(MODULES))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="сколько самых тяжелых пакетов показать")
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="предел медианы для каждого модуля")
+    parser.add_argument("--output", help="дописать JSON еще и в файл")
+    args = parser.parse_args()
+
+    results = [measure(module, args.runs, args.top) for module in args.modules]
+    failed = [
+        r["module"] for r in results
+        if r["median_ms"] > args.budget_ms or r["forbidden_loaded"]
+    ]
+
+    report = json.dumps({"budget_ms": args.budget_ms, "results": results, "failed": failed},
+                        indent=2, ensure_ascii=False)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Исходная схема (то, что создавал init_db через create_all)
+
+Revision ID: 0001_initial
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001_initial"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("username", sa.String(), nullable=True),
+        sa.Column("full_name", sa.String(), nullable=True),
+        sa.Column("referrer_id", sa.BigInteger(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("birth_date", sa.Date(), nullable=True),
+        sa.Column("birth_time", sa.Time(), nullable=True),
+        sa.Column("birth_place", sa.String(), nullable=True),
+        sa.Column("theme", sa.String(), nullable=False),
+        sa.Column("natal_analysis", sa.Text(), nullable=True),
+        sa.Column("numerology_analysis", sa.Text(), nullable=True),
+        sa.Column("daily_advice", sa.Text(), nullable=True),
+        sa.Column("last_advice_date", sa.Date(), nullable=True),
+        sa.Column("daily_affirmation", sa.Text(), nullable=True),
+        sa.Column("last_affirmation_date", sa.Date(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+
+    op.create_table(
+        "analytics_events",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.BigInteger(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("event_type", sa.String(), nullable=False),
+        sa.Column("details", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_analytics_events_event_type", "analytics_events", ["event_type"])
+
+    op.create_table(
+        "transactions",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.BigInteger(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("amount", sa.Integer(), nullable=False),
+        sa.Column("currency", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("transactions")
+    op.drop_index("ix_analytics_events_event_type", table_name="analytics_events")
+    op.drop_table("analytics_events")
+    op.drop_index("ix_users_id", table_name="users")
+    op.drop_table("users")
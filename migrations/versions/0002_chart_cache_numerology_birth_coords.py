@@ -0,0 +1,50 @@
+"""Кэш карт, общие трактовки нумерологии, координаты рождения и версия строки users
+
+Revision ID: 0002_chart_cache_numerology_birth_coords
+Revises: 0001_initial
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002_chart_cache_numerology_birth_coords"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chart_cache",
+        sa.Column("key", sa.String(), primary_key=True),
+        sa.Column("planets", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    )
+
+    op.create_table(
+        "numerology_interpretations",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("number", sa.Integer(), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_numerology_interpretations_number", "numerology_interpretations", ["number"])
+
+    with op.batch_alter_table("users") as batch:
+        batch.add_column(sa.Column("birth_lat", sa.Float(), nullable=True))
+        batch.add_column(sa.Column("birth_lon", sa.Float(), nullable=True))
+        batch.add_column(sa.Column("birth_tz", sa.String(), nullable=True))
+        batch.add_column(sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("users") as batch:
+        batch.drop_column("version")
+        batch.drop_column("birth_tz")
+        batch.drop_column("birth_lon")
+        batch.drop_column("birth_lat")
+
+    op.drop_index("ix_numerology_interpretations_number", table_name="numerology_interpretations")
+    op.drop_table("numerology_interpretations")
+    op.drop_table("chart_cache")
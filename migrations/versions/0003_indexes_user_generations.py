@@ -0,0 +1,79 @@
+"""Индексы под горячие запросы и вынос текстов генераций из users в user_generations
+
+Revision ID: 0003_indexes_user_generations
+Revises: 0002_chart_cache_numerology_birth_coords
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003_indexes_user_generations"
+down_revision = "0002_chart_cache_numerology_birth_coords"
+branch_labels = None
+depends_on = None
+
+GENERATION_COLUMNS = (
+    "natal_analysis", "numerology_analysis",
+    "daily_advice", "last_advice_date",
+    "daily_affirmation", "last_affirmation_date",
+)
+
+
+def upgrade() -> None:
+    # Выборки по пользователю и за период (активные для предгенерации, отчеты)
+    op.create_index("ix_analytics_events_user_id", "analytics_events", ["user_id"])
+    op.create_index("ix_analytics_events_created_at", "analytics_events", ["created_at"])
+    op.create_index("ix_transactions_user_id", "transactions", ["user_id"])
+    op.create_index("ix_transactions_created_at", "transactions", ["created_at"])
+
+    op.create_table(
+        "user_generations",
+        sa.Column("user_id", sa.BigInteger(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("natal_analysis", sa.Text(), nullable=True),
+        sa.Column("numerology_analysis", sa.Text(), nullable=True),
+        sa.Column("daily_advice", sa.Text(), nullable=True),
+        sa.Column("last_advice_date", sa.Date(), nullable=True),
+        sa.Column("daily_affirmation", sa.Text(), nullable=True),
+        sa.Column("last_affirmation_date", sa.Date(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_user_generations_last_advice_date", "user_generations", ["last_advice_date"])
+    op.create_index("ix_user_generations_last_affirmation_date", "user_generations", ["last_affirmation_date"])
+
+    # Переносим только тех, у кого что-то сгенерировано
+    columns = ", ".join(GENERATION_COLUMNS)
+    has_any = " OR ".join(f"{c} IS NOT NULL" for c in GENERATION_COLUMNS)
+    op.execute(
+        f"INSERT INTO user_generations (user_id, {columns}) "
+        f"SELECT id, {columns} FROM users WHERE {has_any}"
+    )
+
+    with op.batch_alter_table("users") as batch:
+        for column in GENERATION_COLUMNS:
+            batch.drop_column(column)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("users") as batch:
+        batch.add_column(sa.Column("natal_analysis", sa.Text(), nullable=True))
+        batch.add_column(sa.Column("numerology_analysis", sa.Text(), nullable=True))
+        batch.add_column(sa.Column("daily_advice", sa.Text(), nullable=True))
+        batch.add_column(sa.Column("last_advice_date", sa.Date(), nullable=True))
+        batch.add_column(sa.Column("daily_affirmation", sa.Text(), nullable=True))
+        batch.add_column(sa.Column("last_affirmation_date", sa.Date(), nullable=True))
+
+    for column in GENERATION_COLUMNS:
+        op.execute(
+            f"UPDATE users SET {column} = "
+            f"(SELECT g.{column} FROM user_generations g WHERE g.user_id = users.id)"
+        )
+
+    op.drop_index("ix_user_generations_last_affirmation_date", table_name="user_generations")
+    op.drop_index("ix_user_generations_last_advice_date", table_name="user_generations")
+    op.drop_table("user_generations")
+
+    op.drop_index("ix_transactions_created_at", table_name="transactions")
+    op.drop_index("ix_transactions_user_id", table_name="transactions")
+    op.drop_index("ix_analytics_events_created_at", table_name="analytics_events")
+    op.drop_index("ix_analytics_events_user_id", table_name="analytics_events")
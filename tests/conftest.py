@@ -0,0 +1,7 @@
+import os
+
+# Настройки читаются при импорте app.core.*: тестам нужны только обязательные поля
+os.environ.setdefault("BOT_TOKEN", "123456:TEST-TOKEN")
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("ADMIN_ID", "0")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
@@ -0,0 +1,138 @@
+import base64
+import hashlib
+import hmac
+import json
+from urllib.parse import parse_qsl, urlencode
+
+import pytest
+from fastapi import HTTPException
+from pydantic import SecretStr
+from starlette.requests import Request
+
+from app.core import auth
+from app.core.config import settings
+
+BOT_TOKEN = "123456:TEST-TOKEN"
+AUTH_DATE = 1700000000
+
+# initData, подписанный по алгоритму Telegram токеном BOT_TOKEN (auth_date = AUTH_DATE)
+INIT_DATA = (
+    "auth_date=1700000000&query_id=AAHdF6IQAAAAAN0XohDhrOrc"
+    "&user=%7B%22id%22%3A42%2C%22first_name%22%3A%22%D0%AF%D0%BD%22%2C%22username%22%3A%22yan%22%7D"
+    "&hash=9a68da7f39c087bc21b8b17922fb6a7357b9aa0e7616cf25248ce48ecd12221c"
+)
+
+
+@pytest.fixture(autouse=True)
+def bot_token(monkeypatch):
+    monkeypatch.setattr(settings, "BOT_TOKEN", SecretStr(BOT_TOKEN))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [AUTH_DATE + 60.0]
+    monkeypatch.setattr(auth.time, "time", lambda: now[0])
+    return now
+
+
+def with_fields(init_data: str, **changes) -> str:
+    fields = dict(parse_qsl(init_data))
+    fields.update(changes)
+    return urlencode(fields)
+
+
+def request_with(authorization: str | None = None, query: str = "") -> Request:
+    headers = [(b"authorization", authorization.encode("latin-1"))] if authorization else []
+    return Request({"type": "http", "method": "GET", "path": "/", "query_string": query.encode(), "headers": headers})
+
+
+# --- INITDATA ---
+def test_init_data_known_good(clock):
+    assert auth.verify_init_data(INIT_DATA) == 42
+
+
+@pytest.mark.parametrize("changes", [
+    {"user": json.dumps({"id": 1})},
+    {"auth_date": str(AUTH_DATE + 1)},
+    {"hash": "0" * 64},
+    {"hash": ""},
+    {"hash": "é" * 64},
+])
+def test_init_data_tampered(clock, changes):
+    with pytest.raises(HTTPException) as error:
+        auth.verify_init_data(with_fields(INIT_DATA, **changes))
+    assert error.value.status_code == 401
+
+
+def test_init_data_other_bot(clock, monkeypatch):
+    monkeypatch.setattr(settings, "BOT_TOKEN", SecretStr("654321:OTHER-TOKEN"))
+    with pytest.raises(HTTPException):
+        auth.verify_init_data(INIT_DATA)
+
+
+def test_init_data_expired(clock):
+    clock[0] = AUTH_DATE + settings.INIT_DATA_MAX_AGE + 1
+    with pytest.raises(HTTPException) as error:
+        auth.verify_init_data(INIT_DATA)
+    assert error.value.status_code == 401
+
+
+# --- СЕССИИ ---
+def test_session_roundtrip_across_workers(clock):
+    token = auth.SessionStore(ttl=3600, maxsize=10).issue(42)
+    # Другой воркер: пустой LRU, тот же ключ из токена бота
+    other = auth.SessionStore(ttl=3600, maxsize=10)
+    assert other.verify(token) == 42
+    assert other.verify(token) == 42
+
+
+def test_session_forged(clock):
+    store = auth.SessionStore(ttl=3600, maxsize=10)
+    user_id, expires_at, signature = store.issue(42).split(".")
+
+    forged_key = hmac.new(b"AstroSession", b"wrong", hashlib.sha256).digest()
+    forged = base64.urlsafe_b64encode(
+        hmac.new(forged_key, f"43.{expires_at}".encode(), hashlib.sha256).digest()[:18]
+    ).decode()
+    for token in (f"43.{expires_at}.{signature}", f"42.{int(expires_at) + 3600}.{signature}",
+                  f"43.{expires_at}.{forged}", f"42.{expires_at}.{'é' * 24}", "garbage", ""):
+        with pytest.raises(HTTPException) as error:
+            store.verify(token)
+        assert error.value.status_code == 401
+
+
+def test_session_expired(clock):
+    store = auth.SessionStore(ttl=3600, maxsize=10)
+    token = store.issue(42)
+    clock[0] += 3601
+    # Токен в LRU, но его срок прошел - повторной проверки подписи он тоже не проходит
+    with pytest.raises(HTTPException):
+        store.verify(token)
+    with pytest.raises(HTTPException):
+        auth.SessionStore(ttl=3600, maxsize=10).verify(token)
+
+
+# --- ЗАВИСИМОСТИ ---
+def test_session_user_reads_bearer_only(clock, monkeypatch):
+    store = auth.SessionStore(ttl=3600, maxsize=10)
+    monkeypatch.setattr(auth, "sessions", store)
+    token = store.issue(42)
+
+    assert auth.session_user(request_with(f"Bearer {token}")) == 42
+    assert auth.session_user(request_with(query=f"token={token}")) is None
+    assert auth.session_user(request_with(f"Basic {token}")) is None
+
+
+def test_path_user(clock, monkeypatch):
+    store = auth.SessionStore(ttl=3600, maxsize=10)
+    monkeypatch.setattr(auth, "sessions", store)
+    monkeypatch.setattr(settings, "AUTH_REQUIRED", True)
+    request = request_with(f"Bearer {store.issue(42)}")
+
+    assert auth.path_user(42, request) == 42
+    with pytest.raises(HTTPException) as error:
+        auth.path_user(43, request)
+    assert error.value.status_code == 403
+    with pytest.raises(HTTPException) as error:
+        auth.path_user(42, request_with())
+    assert error.value.status_code == 401
@@ -0,0 +1,177 @@
+import asyncio
+import time
+import types
+
+import httpx
+import pytest
+from openai import RateLimitError
+
+from app.core import llm_guard
+from app.core.llm_guard import CircuitBreaker, LatencyWindow, LLMGuard, LLMUnavailable
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Подменяем time только в llm_guard: asyncio.sleep и wait_for идут по настоящим часам
+    now = [1000.0]
+    monkeypatch.setattr(llm_guard, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def make_guard(**overrides) -> LLMGuard:
+    options = dict(max_concurrency=4, attempt_timeout=1.0, retries=2, backoff=0.0,
+                   hedge_percentile=0.0, breaker_failures=2, breaker_cooldown=30.0)
+    return LLMGuard(**{**options, **overrides})
+
+
+def rate_limit_error() -> RateLimitError:
+    response = httpx.Response(429, headers={"retry-after": "5"}, request=httpx.Request("POST", "https://api.openai.com"))
+    return RateLimitError("quota exceeded", response=response, body=None)
+
+
+# --- CIRCUIT BREAKER ---
+def test_breaker_open_half_open_close(clock):
+    breaker = CircuitBreaker(failures=2, cooldown=30.0)
+    breaker.failure()
+    assert breaker.allow()
+    breaker.failure()
+    assert not breaker.allow()
+    assert breaker.retry_in() == pytest.approx(30.0)
+
+    clock[0] += 29.0
+    assert not breaker.allow()
+    clock[0] += 1.0
+    # Half-open: пропускаем ровно один пробный вызов
+    assert breaker.retry_in() == 0.0
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.success()
+    assert breaker.allow() and breaker.allow()
+    assert breaker.retry_in() == 0.0
+
+
+def test_breaker_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(failures=2, cooldown=30.0)
+    breaker.failure()
+    breaker.failure()
+    clock[0] += 30.0
+    assert breaker.allow()
+    breaker.failure()
+    assert not breaker.allow()
+    assert breaker.retry_in() == pytest.approx(30.0)
+
+
+def test_breaker_abandoned_probe_is_retried(clock):
+    breaker = CircuitBreaker(failures=1, cooldown=30.0)
+    breaker.failure()
+    clock[0] += 30.0
+    assert breaker.allow()
+    breaker.abandon()
+    assert breaker.allow()
+
+
+def test_rate_limit_does_not_open_breaker(clock):
+    guard = make_guard()
+
+    async def quota():
+        raise rate_limit_error()
+
+    async def scenario():
+        for _ in range(5):
+            with pytest.raises(RateLimitError):
+                await guard.complete("test", quota, deadline=1.0)
+
+    asyncio.run(scenario())
+    assert guard.breaker.allow()
+
+
+def test_open_breaker_rejects_without_calling(clock):
+    guard = make_guard(breaker_failures=1)
+    guard.breaker.failure()
+    calls = []
+
+    async def request():
+        calls.append(1)
+        return "text"
+
+    with pytest.raises(LLMUnavailable):
+        asyncio.run(guard.complete("test", request, deadline=1.0))
+    assert calls == []
+
+
+# --- ПОВТОРЫ И ДЕДЛАЙН ---
+def test_retries_stop_at_deadline(clock):
+    guard = make_guard(retries=10)
+    attempts = []
+
+    async def attempt():
+        # Каждая попытка "длится" секунду по часам модуля
+        attempts.append(clock[0])
+        clock[0] += 1.0
+        raise asyncio.TimeoutError
+
+    with pytest.raises(LLMUnavailable):
+        asyncio.run(guard._with_retries("test", attempt, deadline_at=clock[0] + 2.5))
+    assert attempts == [1000.0, 1001.0, 1002.0]
+
+
+def test_retries_skip_non_retryable(clock):
+    guard = make_guard(retries=10)
+    attempts = []
+
+    async def attempt():
+        attempts.append(1)
+        raise rate_limit_error()
+
+    with pytest.raises(RateLimitError):
+        asyncio.run(guard._with_retries("test", attempt, deadline_at=clock[0] + 10))
+    assert attempts == [1]
+
+
+# --- ХЕДЖИРОВАНИЕ ---
+def primed(guard: LLMGuard, seconds: float) -> LLMGuard:
+    window = guard._latency.setdefault("test", LatencyWindow())
+    for _ in range(window.min_samples):
+        window.record(seconds)
+    return guard
+
+
+def test_hedge_wins_and_cancels_slow_attempt():
+    guard = primed(make_guard(hedge_percentile=95.0), 0.01)
+    started, cancelled = [], []
+
+    async def request():
+        n = len(started)
+        started.append(n)
+        try:
+            await asyncio.sleep(10 if n == 0 else 0)
+        except asyncio.CancelledError:
+            cancelled.append(n)
+            raise
+        return f"answer {n}"
+
+    assert asyncio.run(guard._hedged("test", request)) == "answer 1"
+    assert started == [0, 1]
+    assert cancelled == [0]
+
+
+def test_hedged_call_stops_at_overall_deadline():
+    guard = primed(make_guard(hedge_percentile=95.0, attempt_timeout=0.05, retries=100), 0.01)
+    pending = []
+
+    async def hang():
+        pending.append(asyncio.current_task())
+        await asyncio.sleep(10)
+
+    async def scenario():
+        started = time.monotonic()
+        with pytest.raises(LLMUnavailable):
+            await guard.complete("test", hang, deadline=0.3)
+        await asyncio.sleep(0)
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) < 1.0
+    # Хедж-запросы всех попыток отменены, а не висят до своих 10 секунд
+    assert len(pending) > 1
+    assert all(task.done() for task in pending)
@@ -0,0 +1,108 @@
+import asyncio
+import types
+
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.api.schemas import HoroscopeRequest
+from app.core import auth, ratelimit
+from app.core.config import settings
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Подменяем time только в модуле лимитера: часы event loop остаются настоящими
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit, "time", types.SimpleNamespace(monotonic=lambda: now[0], time=lambda: now[0]))
+    return now
+
+
+def take(backend, key="user:1", rate=0.5, burst=3) -> float:
+    return asyncio.run(backend.take(key, rate, burst))
+
+
+# --- TOKEN BUCKET ---
+def test_bucket_burst_then_refill(clock):
+    backend = ratelimit.MemoryBackend(maxsize=10)
+    assert [take(backend) for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Корзина пуста: токен накопится через 1 / rate секунд
+    assert take(backend) == pytest.approx(2.0)
+
+    clock[0] += 1.0
+    assert take(backend) == pytest.approx(1.0)
+    clock[0] += 1.0
+    assert take(backend) == 0.0
+    assert take(backend) == pytest.approx(2.0)
+
+
+def test_bucket_refill_capped_at_burst(clock):
+    backend = ratelimit.MemoryBackend(maxsize=10)
+    take(backend)
+    clock[0] += 3600
+    assert [take(backend) for _ in range(4)] == [0.0, 0.0, 0.0, pytest.approx(2.0)]
+
+
+def test_buckets_are_per_key(clock):
+    backend = ratelimit.MemoryBackend(maxsize=10)
+    for _ in range(3):
+        take(backend, key="user:1")
+    assert take(backend, key="user:1") > 0
+    assert take(backend, key="user:2") == 0.0
+
+
+@pytest.mark.parametrize("wait, header", [(0.2, "1"), (1.0, "1"), (2.5, "3")])
+def test_retry_after_rounds_up(wait, header):
+    error = ratelimit.too_many_requests(wait)
+    assert error.status_code == 429
+    assert error.headers["Retry-After"] == header
+
+
+# --- БЮДЖЕТ ---
+def test_slot_budget():
+    limiter = ratelimit.RateLimiter(ratelimit.MemoryBackend(maxsize=10), concurrency=2)
+
+    async def scenario():
+        async with limiter.slot(), limiter.slot():
+            with pytest.raises(HTTPException) as error:
+                async with limiter.slot():
+                    pass
+            assert error.value.status_code == 429
+        # Слоты вернулись после выхода, в том числе после исключения
+        with pytest.raises(RuntimeError):
+            async with limiter.slot():
+                raise RuntimeError
+        async with limiter.slot(), limiter.slot():
+            pass
+
+    asyncio.run(scenario())
+    assert limiter._in_flight == 0
+
+
+# --- ЗАВИСИМОСТЬ ---
+def test_admitted_rejects_after_burst(clock, monkeypatch):
+    monkeypatch.setattr(ratelimit, "limiter", ratelimit.RateLimiter(ratelimit.MemoryBackend(maxsize=10), concurrency=8))
+    monkeypatch.setattr(auth, "sessions", auth.SessionStore(ttl=3600, maxsize=10))
+    monkeypatch.setattr(settings, "AUTH_REQUIRED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_USER_BURST", 2)
+    monkeypatch.setattr(settings, "RATE_LIMIT_USER_RATE", 0.5)
+
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(request: HoroscopeRequest = Depends(ratelimit.admitted(HoroscopeRequest))):
+        return {"user_id": request.user_id}
+
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {auth.sessions.issue(42)}"}
+    # user_id из тела игнорируется: лимит считается по пользователю из сессии
+    post = lambda user_id: client.post("/echo", json={"user_id": user_id, "message": "?"}, headers=headers)
+
+    assert [post(42).json(), post(7).json()] == [{"user_id": 42}, {"user_id": 42}]
+    response = post(7)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+
+    clock[0] += 2.0
+    assert post(42).status_code == 200
+    assert ratelimit.limiter._in_flight == 0